@@ -21,7 +21,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'store.middleware.QueryInstrumentationMiddleware',  # ✅ query/template timing, Server-Timing header
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'store.middleware.ReplicaPinningMiddleware',  # ✅ catalog reads on replicas, read-your-writes per browser
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',  # add this
@@ -64,9 +66,39 @@ DATABASES = {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
             'charset': 'utf8mb4',
         },
+        # ✅ Keep connections between requests instead of reconnecting every
+        # time; health checks replace one the server dropped before it is used
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 300)),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1',
     }
 }
 
+# ✅ Optional bounded pool (store/db/pool.py): threads of one process share
+# DB_POOL_SIZE connections and wait up to DB_POOL_TIMEOUT seconds for one.
+# Connections return to the pool at the end of each request, so CONN_MAX_AGE
+# must be 0.
+if int(os.environ.get('DB_POOL_SIZE', 0)):
+    DATABASES['default'].update({
+        'ENGINE': 'store.db.mysql',
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': int(os.environ['DB_POOL_SIZE']),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'RECYCLE': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        },
+    })
+
+# ✅ Read replicas (store/routers.py): DB_REPLICA_HOSTS=host1,host2 adds
+# aliases replica1, replica2… with the primary's credentials. Catalog and
+# reporting reads use them; a browser that just wrote reads from the primary
+# for REPLICA_STICKY_SECONDS. An unreachable replica falls back to primary.
+DATABASE_REPLICAS = []
+for _i, _host in enumerate(h.strip() for h in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if h.strip()):
+    DATABASES[f'replica{_i + 1}'] = {**DATABASES['default'], 'HOST': _host, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{_i + 1}')
+DATABASE_ROUTERS = ['store.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+
 
 # ✅ TIMEZONE FIX (IMPORTANT)
 LANGUAGE_CODE = 'en-us'
@@ -86,6 +118,64 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# ✅ Cache — per deployment via env: locmem (default), file, memcached, redis
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHES = {
+    'default': {
+        'BACKEND': {
+            'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+            'file': 'django.core.cache.backends.filebased.FileBasedCache',
+            'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'redis': 'django.core.cache.backends.redis.RedisCache',
+        }[CACHE_BACKEND],
+        'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / '.cache') if CACHE_BACKEND == 'file' else ''),
+    }
+}
+
 
-MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
\ No newline at end of file
+# ✅ Sessions — db, cache, cached_db (cache-first, DB write-through) or signed_cookies.
+# The store.sessions engines skip the write when the data did not change.
+# locmem is per-process, so only default to cached_db when the cache is shared.
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'db' if CACHE_BACKEND == 'locmem' else 'cached_db')
+SESSION_ENGINE = {
+    'db': 'store.sessions.db',
+    'cache': 'store.sessions.cache',
+    'cached_db': 'store.sessions.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_BACKEND]
+
+# ✅ Carts expire this many days after their last change (default: the
+# session cookie's lifetime); `manage.py cleanup_carts` deletes them
+CART_TTL_DAYS = int(os.environ.get('CART_TTL_DAYS', 14))
+
+# Flash messages ride in a cookie (falling back to the session only when too
+# large) so adding one does not force a session write.
+MESSAGE_BACKEND = os.environ.get('MESSAGE_BACKEND', 'fallback')
+MESSAGE_STORAGE = {
+    'fallback': 'django.contrib.messages.storage.fallback.FallbackStorage',
+    'cookie': 'django.contrib.messages.storage.cookie.CookieStorage',
+    'session': 'django.contrib.messages.storage.session.SessionStorage',
+}[MESSAGE_BACKEND]
+
+# ✅ Order ids — give every app server its own node (0–4194303) when more than
+# one shares the database; unset means host hash XOR pid (see store/ids.py)
+ORDER_ID_NODE = int(os.environ['ORDER_ID_NODE']) if os.environ.get('ORDER_ID_NODE') else None
+
+# ✅ Background tasks (store/tasks.py) run in `manage.py run_worker`; set
+# TASKS_EAGER=1 to run them inline after commit when no worker is running
+TASKS_EAGER = os.environ.get('TASKS_EAGER', '') == '1'
+EXPORT_ROOT = os.environ.get('EXPORT_ROOT', str(BASE_DIR / 'exports'))  # private: not under MEDIA_ROOT
+
+# ✅ Per-request instrumentation (store/middleware.py): one JSON line per
+# request on the store.perf logger; WARNING when a view goes over its
+# @query_budget, repeats a statement, or is slower than PERF_SLOW_REQUEST_MS.
+PERF_SLOW_REQUEST_MS = int(os.environ.get('PERF_SLOW_REQUEST_MS', 500))
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', '') == '1'  # raise instead of log
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {
+        'store.perf': {'handlers': ['console'], 'level': os.environ.get('PERF_LOG_LEVEL', 'INFO'), 'propagate': False},
+    },
+}
@@ -0,0 +1,91 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .catalog import PAGE_SIZE, catalog_version
+
+
+MAX_PAGE_SIZE = 100
+
+
+# ─── CATALOG API ──────────────────────────────────────────────────────────────
+# /api/v1/ serves the public catalog as JSON. A response depends only on the
+# catalog version and the request URL, so its ETag is computed from those two
+# alone: a client sending If-None-Match gets 304 Not Modified after a single
+# lookup of the version row, before any product query runs. The version is a
+# database row bumped in the same transaction as the catalog write, so every
+# process agrees on it. Stock is left out for the same reason: checkout
+# changes it without bumping the version (see store.catalog).
+
+PRODUCT_FIELDS = (
+    'id', 'sku', 'name', 'description', 'price', 'original_price', 'category', 'sizes', 'colors',
+    'rating', 'review_count', 'badge', 'is_trending', 'is_new_arrival', 'created_at', 'images',
+)
+PRODUCT_LIST_FIELDS = tuple(f for f in PRODUCT_FIELDS if f != 'description')
+CATEGORY_FIELDS = ('id', 'name', 'slug', 'image', 'product_count')
+
+
+def catalog_etag(request, *args, **kwargs):
+    """Strong ETag for a catalog API response: catalog version + URL."""
+    params = sorted((key, value) for key, values in request.GET.lists() for value in values)
+    raw = repr((request.get_host(), request.path, params))
+    return f'{catalog_version()}-{hashlib.md5(raw.encode()).hexdigest()[:16]}'
+
+
+def conditional(view):
+    """``@etag(catalog_etag)``, minus the ETag when the catalog changed mid-request.
+
+    The version and the rows are separate reads: a write committing between
+    them would label the new body with the old version, so the version is
+    read again once the body is built and, if it moved, no ETag is sent.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        version = catalog_version()
+        tag = quote_etag(catalog_etag(request))
+        response = get_conditional_response(request, etag=tag)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200 or catalog_version(fresh=True) != version:
+                return response
+        response.headers['ETag'] = tag
+        return response
+    return wrapper
+
+
+def parse_fields(params, allowed, default):
+    """The ``?fields=a,b`` sparse fieldset, in ``allowed`` order; raises ValueError on unknown names."""
+    if not params.get('fields'):
+        return default
+    wanted = {f.strip() for f in params['fields'].split(',') if f.strip()}
+    unknown = wanted.difference(allowed)
+    if unknown:
+        raise ValueError(f'unknown field(s): {", ".join(sorted(unknown))}; choose from {", ".join(allowed)}')
+    return tuple(f for f in allowed if f in wanted)
+
+
+def parse_limit(params):
+    try:
+        return max(1, min(int(params.get('limit') or PAGE_SIZE), MAX_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit must be a whole number')
+
+
+def product_data(product, fields, request):
+    computed = {
+        'category': lambda: product.category_id,
+        'sizes': product.get_sizes,
+        'colors': product.get_colors,
+        'images': lambda: [request.build_absolute_uri(image.url)
+                           for image in (product.image, product.image2, product.image3) if image],
+    }
+    return {f: computed[f]() if f in computed else getattr(product, f) for f in fields}
+
+
+def category_data(category, fields, request):
+    computed = {
+        'image': lambda: request.build_absolute_uri(category.image.url) if category.image else None,
+    }
+    return {f: computed[f]() if f in computed else getattr(category, f) for f in fields}
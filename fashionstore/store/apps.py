@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class StoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'store'
+
+    def ready(self):
+        from . import catalog, rollups  # noqa: F401  registers the cache and rollup signal handlers
@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .models import Cart, User
+from .pricing import bump_cart_version
+
+
+# ─── CART KEY ─────────────────────────────────────────────────────────────────
+# Cart rows hang off a random key stored *in* the session rather than the
+# session key itself, so they survive key rotation and work with the
+# signed-cookie session engine, whose key changes on every write. A customer
+# logged in from before cart keys existed adopts the session key, which is
+# what their cart rows are stored under (logging in sets a cart key since).
+
+CART_KEY = 'cart_key'
+
+
+def get_cart_key(request, create=True):
+    key = request.session.get(CART_KEY)
+    if not key and request.session.get('user_id'):
+        key = request.session.session_key
+    if not key and create:
+        key = get_random_string(32)
+    if key and CART_KEY not in request.session:
+        request.session[CART_KEY] = key
+    return key
+
+
+# ─── CART BADGE ───────────────────────────────────────────────────────────────
+# The navbar badge (number of cart lines) lives in the session so rendering a
+# page costs no query. Cart mutations adjust it, the cart page resets it from
+# the rows it already loaded, and a missing value is recounted once.
+
+SESSION_COUNT_KEY = 'cart_count'
+
+
+def refresh_cart_count(request):
+    cart_key = get_cart_key(request, create=False)
+    count = Cart.objects.filter(session_key=cart_key).count() if cart_key else 0
+    if cart_key:
+        request.session[SESSION_COUNT_KEY] = count
+    return count
+
+
+def get_cart_count(request):
+    count = request.session.get(SESSION_COUNT_KEY)
+    if count is None:
+        count = refresh_cart_count(request)
+    return count
+
+
+def set_cart_count(request, count):
+    if request.session.get(SESSION_COUNT_KEY) != count:
+        request.session[SESSION_COUNT_KEY] = count
+
+
+def adjust_cart_count(request, delta):
+    if SESSION_COUNT_KEY not in request.session:
+        refresh_cart_count(request)
+    else:
+        set_cart_count(request, max(0, request.session[SESSION_COUNT_KEY] + delta))
+
+
+def cart_changed(request, count_delta=0):
+    bump_cart_version(request)
+    if count_delta:
+        adjust_cart_count(request, count_delta)
+
+
+# ─── EXPIRY ───────────────────────────────────────────────────────────────────
+# A cart expires CART_TTL_DAYS after its last change (the newest updated_at
+# of its lines), the same lifetime as the session that would have held it.
+# `cleanup_carts` deletes expired carts in small batches, each in its own
+# short transaction, so the table tracks active shoppers without a long lock.
+
+def cart_ttl():
+    return timedelta(days=getattr(settings, 'CART_TTL_DAYS', 14))
+
+
+def expired_line_count(now=None):
+    """Lines ``delete_expired_carts`` would delete, counted in one query."""
+    cutoff = (now or timezone.now()) - cart_ttl()
+    live = Cart.objects.filter(updated_at__gte=cutoff).values('session_key')
+    return Cart.objects.filter(updated_at__lt=cutoff).exclude(session_key__in=live).count()
+
+
+def delete_expired_carts(batch_size=500, now=None):
+    """Yield the number of lines deleted per batch.
+
+    Walks the stale lines oldest first on (updated_at, pk), so each batch is
+    an indexed range scan and lines of carts still in use are stepped over.
+    """
+    cutoff = (now or timezone.now()) - cart_ttl()
+    stale = Cart.objects.filter(updated_at__lt=cutoff).order_by('updated_at', 'pk')
+    after = None
+    while True:
+        page = stale
+        if after:
+            page = page.filter(Q(updated_at__gt=after[0]) | Q(updated_at=after[0], pk__gt=after[1]))
+        rows = list(page.values_list('updated_at', 'pk', 'session_key')[:batch_size])
+        if not rows:
+            return
+        after = rows[-1][:2]
+        keys = {key for _, _, key in rows}
+        with transaction.atomic():
+            live = set(Cart.objects.filter(session_key__in=keys, updated_at__gte=cutoff)
+                       .values_list('session_key', flat=True).distinct())
+            deleted, _ = Cart.objects.filter(session_key__in=keys - live).delete()
+        if deleted:
+            yield deleted
+
+
+# ─── LOGIN ────────────────────────────────────────────────────────────────────
+# Logging in rotates the session key, which keeps the session data and so the
+# cart. Each customer also remembers their cart key: the cart left behind at
+# logout (or on another device) comes back, and lines added before logging
+# in are folded into it.
+
+def restore_cart(request, user):
+    saved = user.cart_key
+    current = get_cart_key(request, create=False)
+    if saved and saved != current:
+        cutoff = timezone.now() - cart_ttl()
+        if not Cart.objects.filter(session_key=saved, updated_at__gte=cutoff).exists():
+            Cart.objects.filter(session_key=saved).delete()  # expired: start afresh under the same key
+        if current:
+            merge_carts(current, saved)
+    key = saved or get_cart_key(request)
+    request.session[CART_KEY] = key
+    if key != user.cart_key:
+        User.objects.filter(pk=user.pk).update(cart_key=key)
+        user.cart_key = key
+    refresh_cart_count(request)
+    bump_cart_version(request)
+
+
+def merge_carts(source_key, target_key):
+    """Move the lines of cart ``source_key`` into ``target_key``, adding up quantities of equal lines."""
+    with transaction.atomic():
+        target = {
+            (line.product_id, line.size, line.color): line
+            for line in Cart.objects.select_for_update().filter(session_key=target_key)
+        }
+        for line in Cart.objects.select_for_update().filter(session_key=source_key):
+            same = target.get((line.product_id, line.size, line.color))
+            if same:
+                same.quantity += line.quantity
+                same.save(update_fields=['quantity', 'updated_at'])
+                line.delete()
+            else:
+                line.session_key = target_key
+                line.save(update_fields=['session_key', 'updated_at'])
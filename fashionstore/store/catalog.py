@@ -0,0 +1,208 @@
+import hashlib
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CacheVersion, Category, Product, ProductFacet
+from .pagination import keyset_page
+from .search import rank_products, search_products
+
+
+SORT_OPTIONS = {
+    'newest': '-created_at',
+    'price_asc': 'price',
+    'price_desc': '-price',
+    'rating': '-rating',
+    'relevance': '-relevance',  # only meaningful with a search term
+}
+FILTER_KEYS = ('category', 'size', 'color', 'min_price', 'max_price', 'q')
+PAGE_SIZE = 24
+COUNT_CACHE_TTL = 120  # seconds; the "Showing N products" total may lag briefly
+STOREFRONT_CACHE_TTL = 60 * 60
+DETAIL_CACHE_TTL = 60  # bounds how stale "N in stock" can be; orders don't bump the version
+CATALOG_VERSION_KEY = 'catalog'  # CacheVersion.key
+HOME_SECTION_SIZE = 4
+
+
+# ─── FILTERS ──────────────────────────────────────────────────────────────────
+
+def _price(value):
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+
+
+def normalize_filters(params):
+    category = (params.get('category') or '').strip()
+    min_price = _price(params.get('min_price'))
+    max_price = _price(params.get('max_price'))
+    return {
+        'category': category if category.isdigit() else '',
+        'size': (params.get('size') or '').strip(),
+        'color': (params.get('color') or '').strip(),
+        'min_price': str(min_price) if min_price is not None else '',
+        'max_price': str(max_price) if max_price is not None else '',
+        'q': (params.get('q') or '').strip(),
+    }
+
+
+def filter_key(filters):
+    raw = repr((catalog_version(),) + tuple(filters.get(k, '') for k in FILTER_KEYS))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def base_queryset():
+    # category is rendered on every card, description never is
+    return Product.objects.filter(status='active').select_related('category').defer('description')
+
+
+def filter_products(filters, products=None):
+    if products is None:
+        products = base_queryset()
+    if filters['category']:
+        products = products.filter(category_id=filters['category'])
+    if filters['size']:
+        products = products.filter(facets__kind=ProductFacet.SIZE, facets__key=ProductFacet.normalize(filters['size']))
+    if filters['color']:
+        products = products.filter(facets__kind=ProductFacet.COLOR, facets__key=ProductFacet.normalize(filters['color']))
+    if filters['min_price']:
+        products = products.filter(price__gte=filters['min_price'])
+    if filters['max_price']:
+        products = products.filter(price__lte=filters['max_price'])
+    if filters['q']:
+        products = search_products(products, filters['q'])
+    return products
+
+
+# ─── PAGES & COUNTS ───────────────────────────────────────────────────────────
+
+def cached_count(products, filters):
+    key = f'catalog:count:{filter_key(filters)}'
+    count = cache.get(key)
+    if count is None:
+        count = products.order_by().count()
+        cache.set(key, count, COUNT_CACHE_TTL)
+    return count
+
+
+def default_sort(filters):
+    return 'relevance' if filters['q'] else 'newest'
+
+
+def product_page(filters, sort='newest', cursor=None, page_size=PAGE_SIZE, products=None):
+    products = filter_products(filters, products)
+    if sort == 'relevance' and not filters['q']:
+        sort = 'newest'
+    ranked = rank_products(products, filters['q']) if sort == 'relevance' else products
+    page = keyset_page(ranked, SORT_OPTIONS.get(sort, '-created_at'), cursor, page_size)
+    return page, cached_count(products, filters)
+
+
+# ─── CATALOG VERSION ──────────────────────────────────────────────────────────
+# Every cached storefront entry is keyed on a version number that any product,
+# category or facet write bumps, so an admin edit is visible on the next
+# request and stale entries simply age out. The number lives in a database
+# row (CacheVersion), not the cache: with the default per-process locmem
+# cache a bump made by another gunicorn worker, the task worker or a CLI
+# import would otherwise never be seen. The bump is an UPDATE in the
+# writer's own transaction, so the new version and the new data commit
+# together. A request reads the row once and reuses it until it finishes.
+# Bulk writes that bypass the signals (imports, seed_data) call
+# bump_catalog_version themselves. Checkout's stock decrements deliberately
+# do not bump it.
+
+_request_versions = threading.local()
+
+
+@receiver(request_started)
+def _start_version_memo(sender, **kwargs):
+    _request_versions.catalog = None
+    _request_versions.active = True
+
+
+@receiver(request_finished)
+def _end_version_memo(sender, **kwargs):
+    _request_versions.catalog = None
+    _request_versions.active = False
+
+
+def _create_catalog_version():
+    # start from the clock, so a version is never reused if the row is lost
+    row, _ = CacheVersion.objects.get_or_create(
+        key=CATALOG_VERSION_KEY, defaults={'version': int(time.time() * 1000)}
+    )
+    return row.version
+
+
+def catalog_version(fresh=False):
+    version = None if fresh else getattr(_request_versions, 'catalog', None)
+    if version is None:
+        version = (
+            CacheVersion.objects.filter(key=CATALOG_VERSION_KEY).values_list('version', flat=True).first()
+            or _create_catalog_version()
+        )
+        if getattr(_request_versions, 'active', False):
+            _request_versions.catalog = version
+    return version
+
+
+def bump_catalog_version():
+    if not CacheVersion.objects.filter(key=CATALOG_VERSION_KEY).update(version=F('version') + 1):
+        _create_catalog_version()
+    _request_versions.catalog = None
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=ProductFacet)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=ProductFacet)
+def _catalog_changed(sender, raw=False, **kwargs):
+    if not raw:
+        bump_catalog_version()
+
+
+# ─── STOREFRONT CACHE ─────────────────────────────────────────────────────────
+# The home page and product pages look the same to every customer, so their
+# querysets are cached as lists shared by all sessions. The templates cache
+# the rendered grids on top of this with {% cache %} keyed on the same version.
+
+def home_sections():
+    """``{'categories', 'trending'}`` as lists, cached per catalog version."""
+    key = f'storefront:home:{catalog_version()}'
+    sections = cache.get(key)
+    if sections is None:
+        products = Product.objects.filter(status='active').select_related('category')
+        sections = {
+            'categories': list(Category.objects.all()),
+            'trending': list(products.filter(is_trending=True)[:HOME_SECTION_SIZE]),
+        }
+        cache.set(key, sections, STOREFRONT_CACHE_TTL)
+    return sections
+
+
+def product_with_related(pk):
+    """``(product, related)`` for an active product, or ``(None, [])``."""
+    key = f'storefront:product:{catalog_version()}:{pk}'
+    cached = cache.get(key)
+    if cached is None:
+        product = Product.objects.filter(pk=pk, status='active').first()
+        if product is None:
+            # not cached: a miss costs the same one query, and caching every
+            # probed pk would let a crawler fill the cache with empty entries
+            return None, []
+        related = list(
+            Product.objects.filter(category_id=product.category_id, status='active')
+            .exclude(pk=pk).defer('description')[:HOME_SECTION_SIZE]
+        )
+        cached = (product, related)
+        cache.set(key, cached, DETAIL_CACHE_TTL)
+    return cached
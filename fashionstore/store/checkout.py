@@ -0,0 +1,93 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import Product, Order, OrderItem, Cart
+from .pricing import active_promo, build_quote
+
+
+class CheckoutError(Exception):
+    pass
+
+
+class EmptyCart(CheckoutError):
+    pass
+
+
+class OutOfStock(CheckoutError):
+    def __init__(self, product_names):
+        self.product_names = product_names
+        super().__init__(f"Not enough stock for: {', '.join(product_names)}")
+
+
+def reserve_stock(cart_items):
+    # One conditional UPDATE per product, in pk order so concurrent checkouts
+    # take row locks in the same order and cannot deadlock. A product whose
+    # stock would go negative matches no row and is reported back.
+    wanted = Counter()
+    names = {}
+    for item in cart_items:
+        wanted[item.product_id] += item.quantity
+        names[item.product_id] = item.product.name
+    short = []
+    for product_id in sorted(wanted):
+        updated = Product.objects.filter(pk=product_id, stock__gte=wanted[product_id]).update(
+            stock=F('stock') - wanted[product_id]
+        )
+        if not updated:
+            short.append(names[product_id])
+    return short
+
+
+def place_order(cart_key, user, details, order_id, promo_code=''):
+    """Turn the cart behind ``cart_key`` into an Order in one transaction.
+
+    ``details`` holds customer_name, shipping_address, city, pincode and
+    payment_method. Raises EmptyCart or OutOfStock; either way nothing is
+    written.
+    """
+    with transaction.atomic():
+        # Touching the cart rows first takes their write locks up front (and
+        # SQLite's database write lock): a double-submitted form waits here and
+        # then finds the cart already emptied instead of ordering it twice, and
+        # concurrent checkouts queue rather than fail on a lock upgrade.
+        Cart.objects.filter(session_key=cart_key).update(quantity=F('quantity'))
+        cart_items = list(
+            Cart.objects.filter(session_key=cart_key).select_related('product').order_by('pk')
+        )
+        if not cart_items:
+            raise EmptyCart()
+
+        short = reserve_stock(cart_items)
+        if short:
+            raise OutOfStock(short)
+
+        quote = build_quote(cart_items, active_promo(promo_code))
+        order = Order.objects.create(
+            order_id=order_id,
+            user=user,
+            customer_email=user.email if user else '',
+            subtotal=quote.subtotal,
+            shipping_cost=quote.shipping,
+            tax=quote.tax,
+            discount=quote.discount,
+            total=quote.total,
+            promo_code=quote.promo_code,
+            status='pending',
+            **details
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=item.product,
+                product_name=item.product.name,
+                size=item.size,
+                color=item.color,
+                quantity=item.quantity,
+                price=line['unit_price'],
+            )
+            for item, line in zip(cart_items, quote.lines)
+        ])
+        Cart.objects.filter(pk__in=[item.pk for item in cart_items]).delete()
+    return order
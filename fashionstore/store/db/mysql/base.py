@@ -0,0 +1,15 @@
+from django.db.backends.mysql import base
+
+from store.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """django.db.backends.mysql with a per-process connection pool (see store.db.pool)."""
+
+    def ping_raw(self, raw):
+        raw.ping()
+
+    def _set_autocommit(self, autocommit):
+        # a pooled connection usually has the right mode already; skip the round trip
+        if self.connection.get_autocommit() != autocommit:
+            super()._set_autocommit(autocommit)
@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import DatabaseError
+
+
+# ─── POOL ─────────────────────────────────────────────────────────────────────
+# Django keeps one connection per thread and, with CONN_MAX_AGE, holds it for
+# the thread's life. The pooled backends (store.db.mysql, store.db.sqlite3)
+# instead borrow a raw connection from a bounded per-process pool when a
+# request first touches the database and hand it back when Django closes it at
+# the end of the request. A gthread worker's threads then share `MAX_SIZE`
+# warm connections, and a burst beyond that waits instead of opening more.
+
+class PoolTimeout(DatabaseError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, connect, ping, max_size=10, timeout=10.0, recycle=1800, ping_after=5.0):
+        self.connect = connect          # () -> raw DB-API connection
+        self.ping = ping                # (raw) -> None, raises if the connection is dead
+        self.max_size = max_size
+        self.timeout = timeout          # seconds to wait for a free slot
+        self.recycle = recycle          # seconds before a connection is replaced anyway
+        self.ping_after = ping_after    # only health-check connections idle this long
+        self.pid = os.getpid()
+        self._idle = deque()            # (raw, created_at, returned_at), newest last
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self.checkouts = self.waits = self.timeouts = 0
+        self.created = self.reconnects = self.recycled = self.discarded = 0
+        self.wait_seconds = 0.0
+        self.in_use = 0
+
+    def acquire(self):
+        """Return ``(raw, created_at, reused)``; raises PoolTimeout when every slot is busy too long."""
+        if not self._slots.acquire(blocking=False):
+            start = time.monotonic()
+            got = self._slots.acquire(timeout=self.timeout)
+            with self._lock:
+                self.waits += 1
+                self.wait_seconds += time.monotonic() - start
+                self.timeouts += not got
+            if not got:
+                raise PoolTimeout(f'No database connection free within {self.timeout}s ({self.max_size} in use)')
+        try:
+            raw, created_at, reused = self._checkout()
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+        return raw, created_at, reused
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                item = self._idle.pop() if self._idle else None
+            if item is None:
+                raw = self.connect()
+                with self._lock:
+                    self.created += 1
+                return raw, time.monotonic(), False
+            raw, created_at, returned_at = item
+            now = time.monotonic()
+            if self.recycle and now - created_at > self.recycle:
+                self._close(raw)
+                with self._lock:
+                    self.recycled += 1
+                continue
+            if now - returned_at > self.ping_after:
+                try:
+                    self.ping(raw)
+                except Exception:
+                    # dropped by the server (wait_timeout, failover): open a fresh one
+                    self._close(raw)
+                    with self._lock:
+                        self.reconnects += 1
+                    continue
+            return raw, created_at, True
+
+    def release(self, raw, created_at, reusable=True):
+        with self._lock:
+            self.in_use -= 1
+            if reusable:
+                self._idle.append((raw, created_at, time.monotonic()))
+            else:
+                self.discarded += 1
+        if not reusable:
+            self._close(raw)
+        self._slots.release()
+
+    def _close(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close_idle(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for raw, _, _ in idle:
+            self._close(raw)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_size': self.max_size, 'in_use': self.in_use, 'idle': len(self._idle),
+                'checkouts': self.checkouts, 'waits': self.waits, 'wait_ms': round(self.wait_seconds * 1000, 1),
+                'timeouts': self.timeouts, 'created': self.created, 'reconnects': self.reconnects,
+                'recycled': self.recycled, 'discarded': self.discarded,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, factory):
+    """The process's pool for ``alias``; a forked child builds its own."""
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[alias] = factory()
+        return pool
+
+
+def stats():
+    """``{alias: {...}}`` for every pool in this process."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items() if pool.pid == os.getpid()}
+
+
+# ─── BACKEND MIXIN ────────────────────────────────────────────────────────────
+# Pool options live in DATABASES[alias]['POOL'] (MAX_SIZE, TIMEOUT, RECYCLE,
+# PING_AFTER); OPTIONS still go to the driver. Run with CONN_MAX_AGE = 0 so
+# Django hands the connection back after every request.
+
+class PooledDatabaseWrapperMixin:
+    def pool(self, conn_params):
+        options = self.settings_dict.get('POOL', {})
+        return get_pool(self.alias, lambda: ConnectionPool(
+            connect=lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params),
+            ping=self.ping_raw,
+            max_size=options.get('MAX_SIZE', 10),
+            timeout=options.get('TIMEOUT', 10.0),
+            recycle=options.get('RECYCLE', 1800),
+            ping_after=options.get('PING_AFTER', 5.0),
+        ))
+
+    def ping_raw(self, raw):
+        cursor = raw.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+
+    def get_new_connection(self, conn_params):
+        raw, self.pool_created_at, self.pool_reused = self.pool(conn_params).acquire()
+        return raw
+
+    def init_connection_state(self):
+        # session settings survive on a reused connection
+        if not getattr(self, 'pool_reused', False):
+            super().init_connection_state()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # a connection closed mid-transaction, or broken by an error, is not handed on
+        reusable = (
+            not self.in_atomic_block and self.get_autocommit()
+            and (not self.errors_occurred or self.is_usable())
+        )
+        pool = _pools.get(self.alias)
+        if pool is None or pool.pid != os.getpid():
+            return super()._close()
+        pool.release(self.connection, self.pool_created_at, reusable)
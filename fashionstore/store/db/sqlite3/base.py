@@ -0,0 +1,11 @@
+from django.db.backends.sqlite3 import base
+
+from store.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """django.db.backends.sqlite3 with a per-process connection pool (see store.db.pool).
+
+    SQLite connections are cheap; this exists as a local stand-in for the
+    MySQL pool in development and `manage.py benchmark connections`.
+    """
@@ -0,0 +1,97 @@
+import csv
+import json
+from datetime import timedelta
+
+from django.db.models import Prefetch
+from django.utils.dateparse import parse_date
+
+from .models import Order, OrderItem
+
+
+FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+CHUNK_SIZE = 2000
+
+ORDER_FIELDS = [
+    'order_id', 'created_at', 'status', 'customer_name', 'customer_email', 'city', 'pincode',
+    'payment_method', 'subtotal', 'shipping_cost', 'tax', 'discount', 'total', 'promo_code',
+]
+ITEM_FIELDS = ['product_id', 'product_name', 'size', 'color', 'quantity', 'price']
+
+
+# ─── FILTERS ──────────────────────────────────────────────────────────────────
+
+def filter_orders(status='', date_from='', date_to=''):
+    """Orders matching the export filters; dates are YYYY-MM-DD and inclusive.
+
+    Raises ValueError for an unknown status or a malformed date.
+    """
+    orders = Order.objects.all()
+    if status:
+        if status not in dict(Order.STATUS_CHOICES):
+            raise ValueError(f'Unknown order status: {status}')
+        orders = orders.filter(status=status)
+    for value, lookup, offset in ((date_from, 'gte', 0), (date_to, 'lt', 1)):
+        if not value:
+            continue
+        try:
+            day = parse_date(value) if isinstance(value, str) else value
+        except ValueError:  # well formed but not a real day, e.g. 2024-02-30
+            day = None
+        if day is None:
+            raise ValueError(f'Invalid date (expected YYYY-MM-DD): {value}')
+        orders = orders.filter(**{f'created_at__{lookup}': day + timedelta(days=offset)})
+    return orders
+
+
+# ─── STREAMING ────────────────────────────────────────────────────────────────
+# Orders are read in pk-ordered keyset batches with their items prefetched per
+# batch, so memory stays flat however many rows match. (QuerySet.iterator()
+# would not: on MySQL the driver buffers the whole result set client-side.)
+
+def iter_orders(orders, chunk_size=CHUNK_SIZE):
+    items = Prefetch('items', queryset=OrderItem.objects.order_by('pk'))
+    last_pk = 0
+    while True:
+        batch = list(orders.filter(pk__gt=last_pk).order_by('pk').prefetch_related(items)[:chunk_size])
+        if not batch:
+            return
+        yield from batch
+        last_pk = batch[-1].pk
+
+
+def _value(value):
+    if value is None:
+        return ''
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+class _Echo:
+    # csv.writer target that hands each formatted row straight back
+    def write(self, value):
+        return value
+
+
+def csv_lines(orders, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(ORDER_FIELDS + [f'item_{field}' for field in ITEM_FIELDS])
+    for order in iter_orders(orders, chunk_size):
+        head = [_value(getattr(order, field)) for field in ORDER_FIELDS]
+        lines = order.items.all() or [None]  # orders without items still get a row
+        for item in lines:
+            tail = [_value(getattr(item, field)) for field in ITEM_FIELDS] if item else [''] * len(ITEM_FIELDS)
+            yield writer.writerow(head + tail)
+
+
+def jsonl_lines(orders, chunk_size=CHUNK_SIZE):
+    for order in iter_orders(orders, chunk_size):
+        record = {field: _value(getattr(order, field)) for field in ORDER_FIELDS}
+        record['items'] = [
+            {field: getattr(item, field) if field in ('product_id', 'quantity') else _value(getattr(item, field))
+             for field in ITEM_FIELDS}
+            for item in order.items.all()
+        ]
+        yield json.dumps(record) + '\n'
+
+
+def export_lines(orders, fmt='csv', chunk_size=CHUNK_SIZE):
+    return (csv_lines if fmt == 'csv' else jsonl_lines)(orders, chunk_size)
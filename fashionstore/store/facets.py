@@ -0,0 +1,99 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, F, Min, Value, When
+from django.db.models.functions import Cast
+
+from .catalog import filter_key, filter_products
+from .models import Product, ProductFacet
+
+
+PRICE_BANDS = [('', '50'), ('50', '100'), ('100', '200'), ('200', '')]  # [min, max): no price in two bands
+FACET_CACHE_TTL = 60  # seconds
+
+
+# ─── FACET COUNTS ─────────────────────────────────────────────────────────────
+# Each dimension is counted against the current filters minus its own, so the
+# sidebar shows how many products picking another option would return. The
+# four groupings share one (dim, facet, label, n) shape and go to the database
+# as a single UNION ALL query, however many categories, sizes or colours exist.
+
+def _without(filters, *keys):
+    return {**filters, **{k: '' for k in keys}}
+
+
+def _grouped(queryset, dim, facet, label, n):
+    return (
+        queryset.order_by().annotate(dim=Value(dim), facet=facet)
+        .values('dim', 'facet').annotate(label=label, n=n)
+    )
+
+
+def _category_rows(filters):
+    products = filter_products(_without(filters, 'category'))
+    return _grouped(products, 'category', Cast('category_id', CharField()), Value(''), Count('pk'))
+
+
+def _value_rows(filters, kind, own_filter):
+    products = filter_products(_without(filters, own_filter)).order_by().values('pk')
+    facets = ProductFacet.objects.filter(kind=kind, product__in=products)
+    return _grouped(facets, kind, F('key'), Min('value'), Count('product_id'))
+
+
+def _price_band_rows(filters):
+    products = filter_products(_without(filters, 'min_price', 'max_price'))
+    # bands are contiguous, so the first upper bound a price is under wins
+    band = Case(
+        *[When(price__lt=high, then=Value(str(i))) for i, (_, high) in enumerate(PRICE_BANDS) if high],
+        default=Value(str(len(PRICE_BANDS) - 1)), output_field=CharField(),
+    )
+    return _grouped(products, 'price', band, Value(''), Count('pk'))
+
+
+def _price_bands(counts):
+    bands = []
+    for i, (low, high) in enumerate(PRICE_BANDS):
+        if not low:
+            label = f'Under ${high}'
+        elif not high:
+            label = f'${low}+'
+        else:
+            label = f'${low} – ${high}'
+        # max_price is inclusive, so the link stops a cent short of the band's
+        # exclusive bound and shows exactly the products counted here
+        top = str(Decimal(high) - Decimal('0.01')) if high else ''
+        bands.append({'min': low, 'max': top, 'label': label, 'count': counts.get(str(i), 0)})
+    return bands
+
+
+def _size_order(facet):
+    sizes = Product.SIZE_CHOICES
+    return (sizes.index(facet['value']) if facet['value'] in sizes else len(sizes), facet['value'])
+
+
+def facet_counts(filters):
+    key = f'catalog:facets:{filter_key(filters)}'
+    facets = cache.get(key)
+    if facets is None:
+        rows = defaultdict(list)
+        grouped = _category_rows(filters).union(
+            _value_rows(filters, ProductFacet.SIZE, 'size'),
+            _value_rows(filters, ProductFacet.COLOR, 'color'),
+            _price_band_rows(filters),
+            all=True,
+        )
+        for row in grouped:
+            rows[row['dim']].append(row)
+        values = {
+            kind: [{'key': r['facet'], 'value': r['label'], 'count': r['n']} for r in rows[kind]]
+            for kind in (ProductFacet.SIZE, ProductFacet.COLOR)
+        }
+        facets = {
+            'categories': {int(r['facet']) if r['facet'] else None: r['n'] for r in rows['category']},
+            'sizes': sorted(values[ProductFacet.SIZE], key=_size_order),
+            'colors': sorted(values[ProductFacet.COLOR], key=lambda f: (-f['count'], f['value'])),
+            'price_bands': _price_bands({r['facet']: r['n'] for r in rows['price']}),
+        }
+        cache.set(key, facets, FACET_CACHE_TTL)
+    return facets
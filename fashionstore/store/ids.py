@@ -0,0 +1,68 @@
+import os
+import socket
+import threading
+import time
+import zlib
+
+from django.conf import settings
+
+
+# ─── ORDER IDS ────────────────────────────────────────────────────────────────
+# ORD- followed by 16 Crockford base32 characters encoding 80 bits:
+#
+#   44 bits  milliseconds since 2024-01-01   (good for ~550 years)
+#   22 bits  node: settings.ORDER_ID_NODE, or host hash XOR pid
+#   14 bits  per-millisecond sequence       (16384 ids/ms per process)
+#
+# IDs are unique without a database lookup as long as no two live processes
+# share a node, and they sort lexicographically by creation time. The host
+# hash XOR pid is distinct for every process on one machine; give each
+# machine its own ORDER_ID_NODE when several share the database.
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+EPOCH_MS = 1704067200000
+TIME_BITS, NODE_BITS, SEQ_BITS = 44, 22, 14
+ID_CHARS = (TIME_BITS + NODE_BITS + SEQ_BITS) // 5
+PREFIX = 'ORD-'
+
+_lock = threading.Lock()
+_state = {'pid': None, 'node': 0, 'ms': -1, 'seq': 0}
+
+
+def _node():
+    node = getattr(settings, 'ORDER_ID_NODE', None)
+    if node is None:
+        node = zlib.crc32(socket.gethostname().encode()) ^ os.getpid()
+    return node & ((1 << NODE_BITS) - 1)
+
+
+def _encode(number):
+    chars = []
+    for _ in range(ID_CHARS):
+        number, rem = divmod(number, 32)
+        chars.append(ALPHABET[rem])
+    return ''.join(reversed(chars))
+
+
+def generate_order_id():
+    with _lock:
+        pid = os.getpid()
+        if _state['pid'] != pid:  # first call, or we are a freshly forked worker
+            _state.update(pid=pid, node=_node(), ms=-1, seq=0)
+        # never step backwards if the wall clock does
+        ms = max(int(time.time() * 1000) - EPOCH_MS, _state['ms'])
+        if ms == _state['ms']:
+            _state['seq'] += 1
+            if _state['seq'] >> SEQ_BITS:
+                while ms <= _state['ms']:
+                    ms = int(time.time() * 1000) - EPOCH_MS
+                _state['seq'] = 0
+        else:
+            _state['seq'] = 0
+        _state['ms'] = ms
+        number = (ms << (NODE_BITS + SEQ_BITS)) | (_state['node'] << SEQ_BITS) | _state['seq']
+    return PREFIX + _encode(number)
+
+
+def generate_order_ids(count):
+    return [generate_order_id() for _ in range(count)]
@@ -0,0 +1,251 @@
+import csv
+import io
+import json
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from . import rollups
+from .catalog import bump_catalog_version
+from .models import Category, Product, ProductFacet
+
+
+FORMATS = ('csv', 'jsonl')
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+# Columns an import file may carry; only sku, name and price are required.
+# Columns missing from a file leave existing products' values untouched.
+IMPORT_FIELDS = [
+    'sku', 'name', 'price', 'original_price', 'category', 'description', 'stock',
+    'sizes', 'colors', 'status', 'is_trending', 'is_new_arrival', 'badge',
+]
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+
+
+class RowError(ValueError):
+    pass
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.errors = []  # (line, sku, message), capped at MAX_REPORTED_ERRORS
+        self.elapsed = 0.0
+
+    @property
+    def rows(self):
+        return self.created + self.updated + self.unchanged + self.failed
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0
+
+    def error(self, line, sku, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, sku, message))
+
+    def summary(self):
+        return (f'{self.created} created, {self.updated} updated, {self.unchanged} unchanged, {self.failed} failed '
+                f'in {self.elapsed:.1f}s ({self.rate:,.0f} rows/s)')
+
+
+# ─── READING ──────────────────────────────────────────────────────────────────
+
+def detect_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def read_rows(stream, fmt='csv'):
+    """Yield ``(line_number, row_dict)`` from a text stream, one row at a time."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, RowError(f'invalid JSON: {e}')
+            continue
+        yield line_number, row if isinstance(row, dict) else RowError('expected a JSON object')
+
+
+def text_stream(uploaded_file):
+    # uploaded files are binary; decode lazily, tolerating an Excel BOM
+    return io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+
+
+# ─── VALIDATION ───────────────────────────────────────────────────────────────
+
+def _text(row, field, max_length, required=False):
+    value = row.get(field)
+    if isinstance(value, (list, dict)):
+        raise RowError(f'{field} must be text, not a JSON {"list" if isinstance(value, list) else "object"}')
+    value = str(value or '').strip()
+    if required and not value:
+        raise RowError(f'{field} is required')
+    if len(value) > max_length:
+        raise RowError(f'{field} is longer than {max_length} characters')
+    return value
+
+
+def _decimal(row, field, required=False):
+    raw = str(row.get(field) or '').strip()
+    if not raw:
+        if required:
+            raise RowError(f'{field} is required')
+        return None
+    try:
+        value = Decimal(raw).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise RowError(f'{field} is not a number: {raw}')
+    if value < 0 or value >= Decimal('1e8'):
+        raise RowError(f'{field} is out of range: {raw}')
+    return value
+
+
+def _options(row, field, max_length):
+    """sizes/colors: comma-separated text, or (from JSONL) a list of strings joined with commas."""
+    value = row.get(field)
+    if not isinstance(value, list):
+        return _text(row, field, max_length)
+    options = []
+    for option in value:
+        if not isinstance(option, str):
+            raise RowError(f'{field} entries must be strings: {option!r}')
+        option = option.strip()
+        if ',' in option:
+            raise RowError(f'{field} entries cannot contain commas: {option}')
+        if option:
+            options.append(option)
+    return _text({field: ','.join(options)}, field, max_length)
+
+
+def clean_row(row, categories):
+    """Validate one input row into Product field values.
+
+    ``categories`` maps category slugs to ids. Raises RowError.
+    """
+    present = {k for k in row if k in IMPORT_FIELDS}
+    values = {
+        'sku': _text(row, 'sku', 64, required=True),
+        'name': _text(row, 'name', 200, required=True),
+        'price': _decimal(row, 'price', required=True),
+    }
+    if 'original_price' in present:
+        values['original_price'] = _decimal(row, 'original_price')
+    if 'category' in present:
+        slug = _text(row, 'category', 100)
+        if slug and slug not in categories:
+            raise RowError(f'unknown category: {slug}')
+        values['category_id'] = categories.get(slug)
+    if 'description' in present:
+        values['description'] = str(row.get('description') or '')
+    if 'stock' in present:
+        try:
+            values['stock'] = int(str(row.get('stock') or 0).strip())
+        except ValueError:
+            raise RowError(f'stock is not a whole number: {row.get("stock")}')
+        if values['stock'] < 0:
+            raise RowError('stock cannot be negative')
+    for field, max_length in (('sizes', 100), ('colors', 200)):
+        if field in present:
+            values[field] = _options(row, field, max_length)
+    if 'badge' in present:
+        values['badge'] = _text(row, 'badge', 50)
+    if 'status' in present:
+        values['status'] = _text(row, 'status', 20) or 'active'
+        if values['status'] not in dict(Product.STATUS_CHOICES):
+            raise RowError(f'unknown status: {values["status"]}')
+    for field in ('is_trending', 'is_new_arrival'):
+        if field in present:
+            values[field] = str(row.get(field) or '').strip().lower() in TRUE_VALUES
+    return values
+
+
+# ─── UPSERT ───────────────────────────────────────────────────────────────────
+# Rows are validated one at a time but written a batch at a time: one SELECT to
+# find which SKUs exist, one bulk_create, one bulk_update of only the columns
+# that actually changed, and one delete plus bulk_create to rebuild facets for
+# products whose sizes or colours changed. Re-importing an unchanged catalog
+# writes nothing.
+
+FACET_FIELDS = {'sizes', 'colors'}
+
+
+def _write_batch(batch, report):
+    # a SKU repeated inside one batch: the last row wins
+    by_sku = {values['sku']: values for _, values in batch}
+    existing = {p.sku: p for p in Product.objects.filter(sku__in=by_sku)}
+    to_create, to_update, fields, refacet = [], [], set(), []
+    for sku, values in by_sku.items():
+        product = existing.get(sku)
+        if product is None:
+            product = Product(**values)
+            to_create.append(product)
+            refacet.append(product)
+            continue
+        changed = {f for f, value in values.items() if getattr(product, f) != value}
+        for field in changed:
+            setattr(product, field, values[field])
+        if changed:
+            fields |= changed
+            to_update.append(product)
+        if changed & FACET_FIELDS:
+            refacet.append(product)
+
+    with transaction.atomic():
+        Product.objects.bulk_create(to_create)
+        if to_update:
+            Product.objects.bulk_update(to_update, sorted(fields))
+        # MySQL does not return the primary keys of bulk-inserted rows
+        missing = [p.sku for p in to_create if p.pk is None]
+        if missing:
+            pks = dict(Product.objects.filter(sku__in=missing).values_list('sku', 'pk'))
+            for product in to_create:
+                product.pk = product.pk or pks[product.sku]
+        if refacet:
+            ProductFacet.objects.filter(product__in=[p.pk for p in refacet]).delete()
+            ProductFacet.objects.bulk_create([f for p in refacet for f in ProductFacet.build_for(p)])
+
+    report.created += len(to_create)
+    report.updated += len(to_update)
+    report.unchanged += len(by_sku) - len(to_create) - len(to_update)
+
+
+def import_products(rows, batch_size=BATCH_SIZE):
+    """Upsert products keyed on SKU from ``(line_number, row)`` pairs."""
+    report = ImportReport()
+    start = time.perf_counter()
+    categories = dict(Category.objects.values_list('slug', 'pk'))
+    batch = []
+    for line_number, row in rows:
+        sku = row.get('sku', '') if isinstance(row, dict) else ''
+        try:
+            if isinstance(row, Exception):
+                raise row
+            batch.append((line_number, clean_row(row, categories)))
+        except RowError as e:
+            report.error(line_number, sku, str(e))
+            continue
+        if len(batch) >= batch_size:
+            _write_batch(batch, report)
+            batch = []
+    if batch:
+        _write_batch(batch, report)
+
+    if report.created or report.updated:
+        # bulk writes bypass the model signals
+        rollups.rebuild()
+        bump_catalog_version()
+    report.elapsed = time.perf_counter() - start
+    return report
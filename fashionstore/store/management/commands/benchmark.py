@@ -0,0 +1,384 @@
+import io
+import json
+import logging
+import multiprocessing
+import platform
+import statistics
+import subprocess
+import threading
+import time
+from decimal import Decimal
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from store.checkout import CheckoutError, place_order
+from store.db import pool as db_pool
+from store.ids import generate_order_ids
+from store.models import Category, Product, Order, Cart, PromoCode
+from store.pricing import Quote, build_quote
+from store.scenarios import bench_clients, send, shop_page_two, view_scenarios
+from store.search import search_products
+from store.synthetic import SyntheticData
+
+
+class QueryTimer:
+    # connection.execute_wrapper hook; connection.queries only keeps
+    # millisecond-rounded times, too coarse for single indexed lookups
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class Command(BaseCommand):
+    help = 'Time hot code paths against the current database'
+
+    TARGETS = ['search', 'checkout', 'order_ids', 'pricing', 'connections', 'views']
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='*', help=f'any of: {", ".join(self.TARGETS)} (default: all)')
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--terms', default='silk,dress,maxi lace,velvet mini,summer dresses')
+        parser.add_argument('--threads', type=int, default=20)
+        parser.add_argument('--stock', type=int, default=5)
+        parser.add_argument('--processes', type=int, default=8)
+        parser.add_argument('--ids', type=int, default=20000, help='order ids per process')
+        parser.add_argument('--lines', type=int, default=8, help='cart lines per quote')
+        parser.add_argument('--pool-size', type=int, default=8, help='connections: pool slots shared by --threads')
+        parser.add_argument('--scales', default='', help='views: grow the data to these order counts, e.g. 10000,100000')
+        parser.add_argument('--seed', type=int, default=1000, help='views: base seed for --scales data')
+        parser.add_argument('--only', default='', help='views: comma-separated scenario name prefixes')
+        parser.add_argument('--json', help='views: write results to this file')
+        parser.add_argument('--compare', help='views: print deltas against an earlier --json file')
+
+    def handle(self, *args, **opts):
+        unknown = set(opts['targets']) - set(self.TARGETS)
+        if unknown:
+            raise CommandError(f'Unknown benchmark target(s): {", ".join(sorted(unknown))}')
+        for target in opts['targets'] or self.TARGETS:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'▶ {target}'))
+            getattr(self, f'bench_{target}')(opts)
+
+    def report(self, label, samples, extra=''):
+        ms = [s * 1000 for s in samples]
+        self.stdout.write(
+            f'  {label:<28} p50={percentile(ms, 50):8.2f}ms  p95={percentile(ms, 95):8.2f}ms  '
+            f'mean={statistics.mean(ms):8.2f}ms  n={len(ms)} {extra}'
+        )
+
+    # ─── TARGETS ──────────────────────────────────────────────────────────────
+
+    def bench_search(self, opts):
+        products = Product.objects.filter(status='active')
+        terms = [t.strip() for t in opts['terms'].split(',') if t.strip()]
+        self.stdout.write(f'  {products.count()} active products, terms: {terms}')
+
+        def legacy():
+            for term in terms:
+                list(products.filter(Q(name__icontains=term) | Q(description__icontains=term)).values_list('pk', flat=True))
+
+        def indexed():
+            for term in terms:
+                list(search_products(products, term).values_list('pk', flat=True))
+
+        self.report('icontains (legacy)', timed(legacy, opts['repeat']))
+        self.report('search_products', timed(indexed, opts['repeat']))
+
+    def bench_checkout(self, opts):
+        # Many shoppers race for the last few units of one product: every
+        # checkout must either get stock or fail cleanly, never oversell.
+        threads, stock = opts['threads'], opts['stock']
+        product = Product.objects.create(
+            name='Benchmark Low-Stock Dress', description='benchmark', price=50,
+            category=Category.objects.first(), stock=stock, status='hidden',
+        )
+        run = f'bench-{int(time.time() * 1000)}'
+        for i in range(threads):
+            Cart.objects.create(session_key=f'{run}-{i}', product=product, quantity=1)
+
+        samples, outcomes = [], []
+        barrier = threading.Barrier(threads)
+
+        def shopper(i):
+            barrier.wait()
+            start = time.perf_counter()
+            try:
+                place_order(f'{run}-{i}', None, {'customer_name': 'Bench', 'shipping_address': '-',
+                                                 'city': '-', 'pincode': '-', 'payment_method': 'card'},
+                            f'BEN-{i}-{run[-8:]}')
+                outcomes.append('ok')
+            except CheckoutError:
+                outcomes.append('rejected')
+            except Exception as e:  # lock timeouts etc. count as failures
+                outcomes.append(f'{type(e).__name__}: {e}')
+            finally:
+                samples.append(time.perf_counter() - start)
+                connection.close()
+
+        workers = [threading.Thread(target=shopper, args=(i,)) for i in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+        product.refresh_from_db()
+        sold = Order.objects.filter(items__product=product).count()
+        self.report('place_order (contended)', samples,
+                    f"ok={outcomes.count('ok')} rejected={outcomes.count('rejected')}")
+        errors = [o for o in outcomes if o not in ('ok', 'rejected')]
+        if errors:
+            self.stdout.write(self.style.WARNING(f'  errors: {errors}'))
+        self.stdout.write(f'  stock {stock} → {product.stock}, orders placed: {sold}')
+        oversold = sold > stock or product.stock < 0
+        Order.objects.filter(items__product=product).delete()
+        Cart.objects.filter(session_key__startswith=run).delete()
+        product.delete()
+        if oversold:
+            raise CommandError('Oversold: more orders were placed than units in stock.')
+        self.stdout.write(self.style.SUCCESS('  no overselling'))
+
+    def bench_order_ids(self, opts):
+        processes, per_process = opts['processes'], opts['ids']
+        start = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            batches = pool.map(generate_order_ids, [per_process] * processes)
+        elapsed = time.perf_counter() - start
+        ids = [i for batch in batches for i in batch]
+        self.stdout.write(f'  {len(ids)} ids from {processes} processes in {elapsed:.2f}s '
+                          f'({len(ids) / elapsed:,.0f}/s), e.g. {ids[0]}')
+        if any(batch != sorted(batch) for batch in batches):
+            raise CommandError('Order ids are not time-ordered within a process.')
+        if len(set(ids)) != len(ids):
+            raise CommandError(f'{len(ids) - len(set(ids))} duplicate order ids.')
+        if max(len(i) for i in ids) > Order._meta.get_field('order_id').max_length:
+            raise CommandError('Order ids do not fit Order.order_id.')
+        self.stdout.write(self.style.SUCCESS('  all unique, time-ordered, and fit Order.order_id'))
+
+    def bench_pricing(self, opts):
+        # Quotes are pure arithmetic over already-loaded rows, so time them on
+        # unsaved objects: this isolates the pricing cost from query cost.
+        products = [Product(pk=i, name=f'Bench {i}', price=Decimal('19.99') + i) for i in range(opts['lines'])]
+        cart_items = [Cart(pk=i, product=p, quantity=1 + i % 3) for i, p in enumerate(products)]
+        promo = PromoCode(code='BENCH10', discount_pct=10)
+        quotes = 1000
+
+        def legacy():
+            for _ in range(quotes):
+                subtotal = sum(item.product.price * item.quantity for item in cart_items)
+                shipping = 0 if subtotal >= 200 else 12
+                tax = round(float(subtotal) * 0.08, 2)
+                discount = round(float(subtotal) * promo.discount_pct / 100, 2)
+                float(subtotal) + shipping + tax - discount
+
+        def quote():
+            for _ in range(quotes):
+                build_quote(cart_items, promo)
+
+        memo = build_quote(cart_items, promo).to_dict()
+
+        def memo_hit():
+            for _ in range(quotes):
+                Quote.from_dict(memo)
+
+        self.stdout.write(f'  {opts["lines"]} lines per cart, {quotes} quotes per sample')
+        self.report('float math (legacy)', timed(legacy, opts['repeat']))
+        self.report('build_quote', timed(quote, opts['repeat']))
+        self.report('session memo hit', timed(memo_hit, opts['repeat']))
+
+    # ─── CONNECTIONS ──────────────────────────────────────────────────────────
+    # --threads request loops, each "request" one indexed lookup followed by
+    # what Django does at request end (close_if_unusable_or_obsolete), against
+    # three copies of the default database alias: reconnect every request
+    # (CONN_MAX_AGE=0, the old setting), persistent per-thread connections,
+    # and the bounded pool shared by all threads.
+
+    POOLED_ENGINES = {'mysql': 'store.db.mysql', 'sqlite': 'store.db.sqlite3'}
+
+    def bench_connections(self, opts):
+        base = dict(connections['default'].settings_dict)
+        vendor = connections['default'].vendor
+        if vendor not in self.POOLED_ENGINES:
+            raise CommandError(f'connections: no pooled backend for {vendor}')
+        if base['ENGINE'] in self.POOLED_ENGINES.values():
+            base['ENGINE'] = f'django.db.backends.{"mysql" if vendor == "mysql" else "sqlite3"}'
+        pk = Product.objects.values_list('pk', flat=True).first()
+        modes = [
+            ('connect per request', {'CONN_MAX_AGE': 0}),
+            ('persistent', {'CONN_MAX_AGE': None, 'CONN_HEALTH_CHECKS': True}),
+            (f'pool of {opts["pool_size"]}', {'CONN_MAX_AGE': 0, 'ENGINE': self.POOLED_ENGINES[vendor],
+                                               'POOL': {'MAX_SIZE': opts['pool_size'], 'TIMEOUT': 30}}),
+        ]
+        self.stdout.write(f'  {vendor}, {opts["threads"]} threads × {opts["repeat"]} requests')
+        for i, (label, overrides) in enumerate(modes):
+            alias = f'bench_conn_{i}'
+            connections.settings[alias] = {**base, **overrides}
+            samples, lock = [], threading.Lock()
+
+            def worker():
+                conn = connections[alias]
+                mine = []
+                for _ in range(opts['repeat']):
+                    start = time.perf_counter()
+                    Product.objects.using(alias).filter(pk=pk).exists()
+                    conn.close_if_unusable_or_obsolete()
+                    mine.append(time.perf_counter() - start)
+                conn.close()
+                with lock:
+                    samples.extend(mine)
+
+            start = time.perf_counter()
+            workers = [threading.Thread(target=worker) for _ in range(opts['threads'])]
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            rate = len(samples) / (time.perf_counter() - start)
+            self.report(label, samples, f'{rate:,.0f} req/s')
+            pool = db_pool.stats().get(alias)
+            if pool:
+                self.stdout.write(
+                    f'    checkouts={pool["checkouts"]} created={pool["created"]} waits={pool["waits"]} '
+                    f'wait={pool["wait_ms"]}ms reconnects={pool["reconnects"]} timeouts={pool["timeouts"]}'
+                )
+                db_pool.get_pool(alias, None).close_idle()
+
+    # ─── VIEWS ────────────────────────────────────────────────────────────────
+    # Every page in store/urls.py through the test client, so middleware,
+    # sessions and templates are all in the measurement.
+
+    def grow_to(self, scale, seed):
+        missing = scale - Order.objects.count()
+        if missing <= 0:
+            return
+        if SyntheticData(seed).exists():
+            raise CommandError(f'views: seed {seed} was already used; pass another --seed.')
+        self.stdout.write(f'  growing data to {scale:,} orders (+{missing:,})')
+        call_command('seed_data', scale=missing, seed=seed, stdout=io.StringIO())
+
+    def measure(self, client, method, url, data, setup, repeat):
+        samples, queries, query_ms, statuses = [], [], [], set()
+        for i in range(repeat + 1):
+            if setup:
+                setup(client)
+            timer = QueryTimer()
+            with connection.execute_wrapper(timer):
+                start = time.perf_counter()
+                response = send(client, method, url, data)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - start
+            statuses.add(response.status_code)
+            if i == 0:
+                continue  # warm-up: fills caches and the session
+            samples.append(elapsed)
+            queries.append(timer.count)
+            query_ms.append(timer.seconds * 1000)
+        return samples, queries, query_ms, statuses
+
+    def bench_views(self, opts):
+        scales = [int(x) for x in opts['scales'].split(',') if x.strip()] or [None]
+        only = [x.strip() for x in opts['only'].split(',') if x.strip()]
+        results = []
+        logging.getLogger('store.perf').setLevel(logging.ERROR)  # one log line per request would drown the table
+        for i, scale in enumerate(scales):
+            if scale is not None:
+                self.grow_to(scale, opts['seed'] + i)
+            results += self.run_views(opts, only, scale)
+
+        if opts['json']:
+            with open(opts['json'], 'w') as f:
+                json.dump({'meta': self.run_meta(), 'results': results}, f, indent=2)
+            self.stdout.write(f'  results written to {opts["json"]}')
+        if opts['compare']:
+            self.compare(results, opts['compare'])
+
+    def run_views(self, opts, only, scale):
+        try:
+            product, scenarios = view_scenarios()
+        except LookupError as e:
+            raise CommandError(f'views: {e}')
+        stock = product.stock
+        orders = Order.objects.count()
+        self.stdout.write(f'  {orders:,} orders, {Product.objects.count():,} products, {connection.vendor}')
+        results = []
+        with bench_clients() as clients:
+            try:
+                for name, who, method, url, data, setup in scenarios:
+                    if only and not any(name.startswith(o) for o in only):
+                        continue
+                    if name == 'shop page 2':
+                        url = shop_page_two(clients['customer'])
+                        if not url:
+                            continue
+                    samples, queries, query_ms, statuses = self.measure(
+                        clients[who], method, url, data, setup, opts['repeat'])
+                    ms = [s * 1000 for s in samples]
+                    result = {
+                        'view': name, 'url': url, 'method': method.upper(), 'scale': scale or orders,
+                        'p50_ms': round(percentile(ms, 50), 2), 'p95_ms': round(percentile(ms, 95), 2),
+                        'p99_ms': round(percentile(ms, 99), 2), 'mean_ms': round(statistics.mean(ms), 2),
+                        'queries': statistics.median(queries), 'query_ms': round(statistics.median(query_ms), 2),
+                        'status': sorted(statuses), 'n': len(ms),
+                    }
+                    results.append(result)
+                    bad = [code for code in statuses if code >= 400]
+                    self.stdout.write(
+                        f'  {name:<24} p50={result["p50_ms"]:8.2f}ms  p95={result["p95_ms"]:8.2f}ms  '
+                        f'queries={result["queries"]:>4}  db={result["query_ms"]:7.2f}ms'
+                        + (self.style.ERROR(f'  HTTP {bad}') if bad else '')
+                    )
+            finally:
+                Product.objects.filter(pk=product.pk).update(stock=stock)
+        return results
+
+    def run_meta(self):
+        try:
+            commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                    text=True, timeout=5).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            commit = ''
+        return {
+            'commit': commit, 'timestamp': timezone.now().isoformat(), 'database': connection.vendor,
+            'django': django.get_version(), 'python': platform.python_version(),
+        }
+
+    def compare(self, results, path):
+        with open(path) as f:
+            baseline = {(r['view'], r['scale']): r for r in json.load(f)['results']}
+        self.stdout.write(self.style.MIGRATE_HEADING(f'▶ compared with {path}'))
+        for r in results:
+            old = baseline.get((r['view'], r['scale']))
+            if not old:
+                continue
+            change = (r['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0
+            line = (f'  {r["view"]:<24} p50 {old["p50_ms"]:8.2f} → {r["p50_ms"]:8.2f}ms ({change:+6.1f}%)  '
+                    f'queries {old["queries"]:>4} → {r["queries"]:>4}')
+            worse = change > 10 or r['queries'] > old['queries']
+            self.stdout.write(self.style.WARNING(line) if worse else line)
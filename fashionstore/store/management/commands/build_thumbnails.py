@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from store import thumbnails
+from store.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = 'Create the resized WebP/JPEG derivatives for every product and category image'
+
+    def handle(self, *args, **kwargs):
+        built = failed = 0
+        for model, fields in ((Product, ('image', 'image2', 'image3')), (Category, ('image',))):
+            for instance in model.objects.only('pk', *fields).iterator():
+                for field in fields:
+                    image = getattr(instance, field)
+                    if not image:
+                        continue
+                    try:
+                        thumbnails.build(image)
+                        built += 1
+                    except thumbnails.IMAGE_ERRORS as e:
+                        failed += 1
+                        self.stderr.write(f'  {model.__name__} {instance.pk} {field}: {e}')
+        self.stdout.write(self.style.SUCCESS(f'✅ Thumbnails ready for {built} images ({failed} failed)'))
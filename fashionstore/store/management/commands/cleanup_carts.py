@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.cart import cart_ttl, delete_expired_carts, expired_line_count
+
+
+class Command(BaseCommand):
+    help = 'Delete carts untouched for CART_TTL_DAYS, in small batches; run it daily from cron'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='stale lines examined per batch')
+        parser.add_argument('--sleep', type=float, default=0.0, help='pause between batches (e.g. to spare replicas)')
+        parser.add_argument('--dry-run', action='store_true', help='count expired cart lines without deleting')
+
+    def handle(self, *args, **opts):
+        days = cart_ttl().days
+        if opts['dry_run']:
+            self.stdout.write(f'{expired_line_count()} cart line(s) older than {days} days would be deleted')
+            return
+        total = batches = 0
+        for deleted in delete_expired_carts(opts['batch_size']):
+            total += deleted
+            batches += 1
+            if opts['sleep']:
+                time.sleep(opts['sleep'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total} cart line(s) older than {days} days deleted in {batches} batch(es)'
+        ))
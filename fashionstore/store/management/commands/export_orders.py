@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store import exports
+
+
+class Command(BaseCommand):
+    help = 'Stream orders and their items as CSV or JSONL at constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', default='csv', choices=sorted(exports.FORMATS))
+        parser.add_argument('--status', default='')
+        parser.add_argument('--from', dest='date_from', default='', help='first day, YYYY-MM-DD')
+        parser.add_argument('--to', dest='date_to', default='', help='last day (inclusive), YYYY-MM-DD')
+        parser.add_argument('--output', '-o', default='-', help='file path, or - for stdout')
+        parser.add_argument('--chunk-size', type=int, default=exports.CHUNK_SIZE)
+
+    def handle(self, *args, **opts):
+        try:
+            orders = exports.filter_orders(opts['status'], opts['date_from'], opts['date_to'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        out = sys.stdout if opts['output'] == '-' else open(opts['output'], 'w', newline='', encoding='utf-8')
+        try:
+            for line in exports.export_lines(orders, opts['format'], opts['chunk_size']):
+                out.write(line)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if out is not sys.stdout:
+            self.stderr.write(self.style.SUCCESS(f'✅ Orders exported to {opts["output"]}'))
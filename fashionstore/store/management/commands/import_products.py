@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store import importers
+
+
+class Command(BaseCommand):
+    help = 'Bulk upsert products keyed on SKU from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=importers.FORMATS, help='default: from the file extension')
+        parser.add_argument('--batch-size', type=int, default=importers.BATCH_SIZE)
+        parser.add_argument('--show-errors', type=int, default=20, help='row errors to print')
+
+    def handle(self, *args, **opts):
+        fmt = opts['format'] or importers.detect_format(opts['path'])
+        try:
+            with open(opts['path'], encoding='utf-8-sig', newline='') as f:
+                report = importers.import_products(importers.read_rows(f, fmt), opts['batch_size'])
+        except OSError as e:
+            raise CommandError(e)
+
+        for line, sku, message in report.errors[:opts['show_errors']]:
+            self.stdout.write(self.style.WARNING(f'  line {line} {sku or "-"}: {message}'))
+        if report.failed > opts['show_errors']:
+            self.stdout.write(f'  … and {report.failed - opts["show_errors"]} more')
+        style = self.style.SUCCESS if not report.failed else self.style.WARNING
+        self.stdout.write(style(f'✅ {report.summary()}'))
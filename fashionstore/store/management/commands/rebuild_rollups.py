@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from store.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the admin dashboard rollups from the order, user and product tables'
+
+    def handle(self, *args, **kwargs):
+        keys = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'✅ {keys} rollups rebuilt'))
@@ -0,0 +1,54 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from store import tasks
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (thumbnails, exports, rollup rebuilds); start several to scale out'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='exit when the queue is empty')
+        parser.add_argument('--sleep', type=float, default=1.0, help='seconds to wait when the queue is empty')
+        parser.add_argument('--max-tasks', type=int, default=0, help='exit after this many tasks (0: no limit)')
+
+    def handle(self, *args, **opts):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        worker = tasks.worker_name()
+        self.stdout.write(f'▶ worker {worker} ({", ".join(sorted(tasks.REGISTRY))})')
+        done = failed = 0
+        last_sweep = 0
+        while not self.stopping:
+            if time.monotonic() - last_sweep > 60:
+                recovered, pruned = tasks.requeue_stale(), tasks.prune()
+                if recovered or pruned:
+                    self.stdout.write(f'  {recovered} stale task(s) recovered, {pruned} old task(s) pruned')
+                last_sweep = time.monotonic()
+
+            close_old_connections()  # the worker outlives CONN_MAX_AGE like a long request would
+            job = tasks.claim(worker)
+            if job is None:
+                if opts['once']:
+                    break
+                time.sleep(opts['sleep'])
+                continue
+
+            start = time.perf_counter()
+            ok = tasks.run(job)
+            done, failed = done + ok, failed + (not ok)
+            line = f'  {job.name} #{job.pk} {"done" if ok else "failed"} in {time.perf_counter() - start:.2f}s'
+            self.stdout.write(line if ok else self.style.WARNING(line))
+            if opts['max_tasks'] and done + failed >= opts['max_tasks']:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'✅ worker stopped: {done} done, {failed} failed'))
+
+    def stop(self, signum, frame):
+        # finish the task in hand, then exit
+        self.stopping = True
@@ -1,7 +1,11 @@
 import hashlib
 import random
-from django.core.management.base import BaseCommand
+import time
+from django.core.management.base import BaseCommand, CommandError
+from store.catalog import bump_catalog_version
 from store.models import User, Category, Product, Order, OrderItem, PromoCode
+from store.rollups import rebuild
+from store.synthetic import SyntheticData
 
 
 def h(pw):
@@ -9,10 +13,23 @@ def h(pw):
 
 
 class Command(BaseCommand):
-    help = 'Seed database with dummy data'
+    help = 'Seed database with dummy data (add --scale N for N synthetic load-test orders)'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=0, help='synthetic orders to generate')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--users', type=int, help='default: scale / 10')
+        parser.add_argument('--products', type=int, help='default: scale / 200, at least 50')
+        parser.add_argument('--carts', type=int, help='cart lines; default: scale / 20')
+        parser.add_argument('--days', type=int, default=365, help='spread order dates over this many days')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **opts):
         self.stdout.write('🌱 Seeding database...')
+        if opts['scale']:
+            synthetic = SyntheticData(opts['seed'], opts['days'], opts['batch_size'], self.stdout.write)
+            if synthetic.exists():
+                raise CommandError(f'Synthetic data for seed {opts["seed"]} already exists; pass another --seed.')
 
         # PROMO CODES
         PromoCode.objects.get_or_create(code='CHIC10', defaults={'discount_pct': 10})
@@ -154,9 +171,31 @@ class Command(BaseCommand):
                 )
 
         self.stdout.write('✅ 12 sample orders created')
+
+        if opts['scale']:
+            self.seed_scale(synthetic, opts)
+
+        # bulk writes bypass the model signals
+        rebuild()
+        bump_catalog_version()
+        self.stdout.write('✅ Dashboard rollups rebuilt')
         self.stdout.write(self.style.SUCCESS('\n🎉 Database seeded successfully!'))
         self.stdout.write('\n📋 LOGIN CREDENTIALS:')
         self.stdout.write('   Admin  → username: admin  | password: admin')
         self.stdout.write('   User 1 → username: sarah_j | password: sarah123')
         self.stdout.write('   User 2 → username: michael_c | password: michael123')
         self.stdout.write('   User 3 → username: emma_w | password: emma123')
+
+    def seed_scale(self, data, opts):
+        scale = opts['scale']
+        users = opts['users'] or max(1, scale // 10)
+        products = opts['products'] or max(50, scale // 200)
+        carts = opts['carts'] if opts['carts'] is not None else scale // 20
+        self.stdout.write(f'📈 Generating {scale:,} orders, {users:,} users, {products:,} products, '
+                          f'{carts:,} cart lines (seed {opts["seed"]})')
+        started = time.perf_counter()
+        user_rows = data.users(users)
+        product_rows = data.products(products)
+        data.carts(carts, product_rows)
+        data.orders(scale, user_rows, product_rows)
+        self.stdout.write(f'✅ Synthetic data generated in {time.perf_counter() - started:.0f}s')
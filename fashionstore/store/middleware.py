@@ -0,0 +1,137 @@
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from . import routers
+from .perf import QueryBudgetExceeded, RequestStats, install_template_timing, over_budget
+
+
+logger = logging.getLogger('store.perf')
+
+
+class QueryInstrumentationMiddleware:
+    """Measure every request's SQL and template cost.
+
+    Adds a ``Server-Timing`` header (visible in the browser's network panel),
+    logs one JSON line per request to the ``store.perf`` logger (WARNING when
+    the view's query budget is exceeded, statements repeat, or the request
+    is slow), and attaches the stats to the response as ``query_stats``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'PERF_SLOW_REQUEST_MS', 500)
+        self.strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+        install_template_timing()
+
+    def __call__(self, request):
+        stats = RequestStats()
+        request.query_budget = None
+        request.query_stats = stats
+        token = stats.activate()
+        start = time.perf_counter()
+        try:
+            with self.counting(stats):
+                response = self.get_response(request)
+        finally:
+            stats.deactivate(token)
+
+        response.query_stats = stats
+        response.query_budget = request.query_budget
+        if response.streaming:
+            # the body is read after we return: keep counting while it streams
+            # and log the real total at the end. The header has gone by then,
+            # so it can only report what ran before the body.
+            response['Server-Timing'] = self.server_timing(stats, start, 'queries before the body')
+            response.streaming_content = self.stream(request, response, stats, start, response.streaming_content)
+            return response
+        response['Server-Timing'] = self.server_timing(stats, start, 'queries')
+        self.finish(request, response, stats, start)
+        return response
+
+    @contextmanager
+    def counting(self, stats):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            yield
+
+    def stream(self, request, response, stats, start, content):
+        finished = False
+        try:
+            with self.counting(stats):
+                stats.streaming = True
+                yield from content
+            finished = True
+        finally:
+            stats.streaming = False
+            # a client that hangs up mid-download is logged, but not raised on
+            self.finish(request, response, stats, start, strict=finished)
+
+    def server_timing(self, stats, start, label):
+        total_ms = (time.perf_counter() - start) * 1000
+        return ', '.join([
+            f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.queries} {label}"',
+            f'tpl;dur={stats.template_seconds * 1000:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ])
+
+    def finish(self, request, response, stats, start, strict=True):
+        self.log(request, response, stats, (time.perf_counter() - start) * 1000)
+        problem = over_budget(stats, request.query_budget)
+        if problem and strict and self.strict:
+            raise QueryBudgetExceeded(f'{request.path}: {problem}')
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
+        request.query_stats.count_stream = getattr(view_func, 'query_budget_counts_stream', True)
+
+    def log(self, request, response, stats, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'db_ms': round(stats.sql_seconds * 1000, 1),
+            'template_ms': round(stats.template_seconds * 1000, 1),
+            'queries': stats.queries,
+            'budget': request.query_budget,
+            'duplicate_queries': stats.duplicate_queries,
+        }
+        if response.streaming:
+            record['stream_queries'] = stats.stream_queries
+        if stats.duplicate_queries:
+            record['duplicates'] = [
+                {'id': fid, 'count': count, 'sql': sql[:200]} for fid, count, sql in stats.duplicates[:3]
+            ]
+        noisy = over_budget(stats, request.query_budget) or stats.duplicate_queries or total_ms > self.slow_ms
+        logger.log(logging.WARNING if noisy else logging.INFO, json.dumps(record))
+
+
+class ReplicaPinningMiddleware:
+    """Route a request's catalog reads to replicas, keeping read-your-writes per browser."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(routers.PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        with routers.replica_reads(pinned=pinned_until > time.time()) as state:
+            response = self.get_response(request)
+        # a write whose transaction rolled back still pins: harmless
+        if state.wrote:
+            response.set_cookie(
+                routers.PIN_COOKIE, f'{time.time() + self.sticky:.0f}', max_age=self.sticky,
+                secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax',
+            )
+        return response
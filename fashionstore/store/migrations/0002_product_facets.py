@@ -0,0 +1,57 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+BATCH_SIZE = 1000
+
+
+def split_csv(value):
+    return [v.strip() for v in (value or '').split(',') if v.strip()]
+
+
+def backfill_facets(apps, schema_editor):
+    Product = apps.get_model('store', 'Product')
+    ProductFacet = apps.get_model('store', 'ProductFacet')
+    batch = []
+    rows = Product.objects.values_list('pk', 'sizes', 'colors').order_by('pk')
+    for pk, sizes, colors in rows.iterator(chunk_size=BATCH_SIZE):
+        for kind, raw in (('size', sizes), ('color', colors)):
+            seen = set()
+            for value in split_csv(raw):
+                key = value.lower()[:50]
+                if key in seen:
+                    continue
+                seen.add(key)
+                batch.append(ProductFacet(product_id=pk, kind=kind, value=value[:50], key=key, position=len(seen)))
+        if len(batch) >= BATCH_SIZE:
+            ProductFacet.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ProductFacet.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('size', 'Size'), ('color', 'Color')], max_length=10)),
+                ('value', models.CharField(max_length=50)),
+                ('key', models.CharField(max_length=50)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facets', to='store.product')),
+            ],
+            options={
+                'db_table': 'store_product_facet',
+                'indexes': [models.Index(fields=['kind', 'key', 'product'], name='store_facet_lookup_idx')],
+                'unique_together': {('product', 'kind', 'key')},
+            },
+        ),
+        migrations.RunPython(backfill_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+# FULLTEXT indexes are MySQL-only; other backends use the LIKE fallback in
+# store/search.py, so on them this migration is a no-op.
+
+INDEXES = [
+    ('store_product_search_ft', 'name, description'),
+    ('store_product_name_ft', 'name'),
+]
+
+
+def add_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    for name, columns in INDEXES:
+        schema_editor.execute(f'CREATE FULLTEXT INDEX {name} ON store_product ({columns})')
+
+
+def drop_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    for name, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX {name} ON store_product')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0002_product_facets'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext, drop_fulltext),
+    ]
@@ -0,0 +1,31 @@
+import time
+
+from django.db import migrations, models
+
+
+def create_catalog_version(apps, schema_editor):
+    CacheVersion = apps.get_model('store', 'CacheVersion')
+    # start from the clock, so no version handed out by the old cache-based stamp is reused
+    CacheVersion.objects.get_or_create(key='catalog', defaults={'version': int(time.time() * 1000)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_task_heartbeat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('version', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'store_cache_version',
+            },
+        ),
+        migrations.RunPython(create_catalog_version, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 
 class User(models.Model):
@@ -12,13 +12,24 @@ class User(models.Model):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='customer')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
+    cart_key = models.CharField(max_length=32, blank=True, default='')  # cart restored at the next login
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.name} ({self.role})"
 
+    def save(self, *args, **kwargs):
+        # in a transaction so store.rollups can lock the old row while it diffs
+        # a tracked field, and its delta commits together with the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         db_table = 'store_user'
+        indexes = [
+            models.Index(fields=['role', 'status'], name='user_role_status_idx'),
+            models.Index(fields=['role', 'created_at'], name='user_role_created_idx'),
+        ]
 
 
 class Category(models.Model):
@@ -38,6 +49,7 @@ class Product(models.Model):
     STATUS_CHOICES = [('active', 'Active'), ('hidden', 'Hidden'), ('out_of_stock', 'Out of Stock')]
     SIZE_CHOICES = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
 
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)  # stable key for bulk imports
     name = models.CharField(max_length=200)
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -60,11 +72,34 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # one transaction: store.rollups locks the old row when a tracked
+        # field changes, and its delta and the facets commit with the product
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_facets()
+
+    def sync_facets(self):
+        facets = ProductFacet.build_for(self)
+        # value and position too: a recased colour or reordered sizes keep
+        # their keys but still change what the product page shows
+        current = {(f.kind, f.key, f.value, f.position) for f in self.facets.all()}
+        if current != {(f.kind, f.key, f.value, f.position) for f in facets}:
+            self.facets.all().delete()
+            ProductFacet.objects.bulk_create(facets)
+        self.__dict__.get('_prefetched_objects_cache', {}).pop('facets', None)
+
+    def facet_values(self, kind):
+        cache = getattr(self, '_prefetched_objects_cache', {})
+        if 'facets' in cache:
+            return [f.value for f in sorted(cache['facets'], key=lambda f: f.position) if f.kind == kind]
+        return split_csv(self.sizes if kind == ProductFacet.SIZE else self.colors)
+
     def get_sizes(self):
-        return [s.strip() for s in self.sizes.split(',')]
+        return self.facet_values(ProductFacet.SIZE)
 
     def get_colors(self):
-        return [c.strip() for c in self.colors.split(',')]
+        return self.facet_values(ProductFacet.COLOR)
 
     def discount_pct(self):
         if self.original_price and self.original_price > self.price:
@@ -73,6 +108,58 @@ class Product(models.Model):
 
     class Meta:
         db_table = 'store_product'
+        # status='active' leads every storefront query; the second column
+        # matches the shop sort options and the home page flags
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='product_status_created_idx'),
+            models.Index(fields=['status', 'price'], name='product_status_price_idx'),
+            models.Index(fields=['status', 'rating'], name='product_status_rating_idx'),
+            models.Index(fields=['status', 'is_trending'], name='product_status_trending_idx'),
+            models.Index(fields=['status', 'is_new_arrival'], name='product_status_new_idx'),
+        ]
+
+
+def split_csv(value):
+    return [v.strip() for v in (value or '').split(',') if v.strip()]
+
+
+class ProductFacet(models.Model):
+    # One row per size/colour a product comes in, so shop filters are indexed
+    # exact lookups instead of LIKE scans over the comma-joined columns.
+    SIZE = 'size'
+    COLOR = 'color'
+    KIND_CHOICES = [(SIZE, 'Size'), (COLOR, 'Color')]
+
+    product = models.ForeignKey(Product, related_name='facets', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    value = models.CharField(max_length=50)
+    key = models.CharField(max_length=50)  # lower-cased value used for lookups
+    position = models.PositiveSmallIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.product_id}: {self.kind}={self.value}"
+
+    @staticmethod
+    def normalize(value):
+        return value.strip().lower()
+
+    @classmethod
+    def build_for(cls, product):
+        facets = []
+        for kind, raw in ((cls.SIZE, product.sizes), (cls.COLOR, product.colors)):
+            seen = set()
+            for value in split_csv(raw):
+                key = cls.normalize(value)[:50]
+                if key in seen:
+                    continue
+                seen.add(key)
+                facets.append(cls(product=product, kind=kind, value=value[:50], key=key, position=len(seen)))
+        return facets
+
+    class Meta:
+        db_table = 'store_product_facet'
+        unique_together = [('product', 'kind', 'key')]
+        indexes = [models.Index(fields=['kind', 'key', 'product'], name='store_facet_lookup_idx')]
 
 
 class Order(models.Model):
@@ -105,9 +192,20 @@ class Order(models.Model):
     def __str__(self):
         return f"#{self.order_id} — {self.customer_name}"
 
+    def save(self, *args, **kwargs):
+        # in a transaction so store.rollups can lock the old row while it diffs
+        # a tracked field, and its delta commits together with the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         db_table = 'store_order'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='order_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+            models.Index(fields=['user', 'created_at'], name='order_user_created_idx'),
+        ]
 
 
 class OrderItem(models.Model):
@@ -133,6 +231,7 @@ class Cart(models.Model):
     color = models.CharField(max_length=50, default='Black')
     quantity = models.IntegerField(default=1)
     added_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def subtotal(self):
         return self.product.price * self.quantity
@@ -142,6 +241,10 @@ class Cart(models.Model):
 
     class Meta:
         db_table = 'store_cart'
+        indexes = [
+            models.Index(fields=['session_key', 'product', 'size', 'color'], name='cart_session_line_idx'),
+            models.Index(fields=['updated_at'], name='cart_updated_idx'),
+        ]
 
 
 class PromoCode(models.Model):
@@ -154,3 +257,61 @@ class PromoCode(models.Model):
 
     class Meta:
         db_table = 'store_promo'
+
+
+class Rollup(models.Model):
+    # Precomputed dashboard metric, maintained by store.rollups.
+    key = models.CharField(max_length=64, unique=True)
+    count = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.key}: {self.count} / {self.amount}"
+
+    class Meta:
+        db_table = 'store_rollup'
+
+
+class CacheVersion(models.Model):
+    # Shared stamp for cached data (store.catalog): bumped in the writer's
+    # transaction, so every process sees a change as soon as it commits.
+    key = models.CharField(max_length=64, unique=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.key}: {self.version}"
+
+    class Meta:
+        db_table = 'store_cache_version'
+
+
+class Task(models.Model):
+    # Background job for store.tasks; `manage.py run_worker` claims and runs them.
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    dedupe_key = models.CharField(max_length=40, blank=True)  # set for enqueue(unique=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)  # renewed while running; see tasks.LEASE
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    class Meta:
+        db_table = 'store_task'
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='task_status_run_after_idx'),
+            models.Index(fields=['name', 'status'], name='task_name_status_idx'),
+            models.Index(fields=['dedupe_key', 'status'], name='task_dedupe_status_idx'),
+        ]
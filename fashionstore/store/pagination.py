@@ -0,0 +1,74 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+# ─── KEYSET PAGINATION ────────────────────────────────────────────────────────
+# Pages are addressed by an opaque cursor holding the sort value and pk of the
+# last row on the previous page, so fetching page N is one indexed range scan
+# instead of an OFFSET that grows with N.
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def encode_cursor(values):
+    raw = json.dumps([str(v) for v in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != 2:
+        return None
+    return values
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=24):
+    """Return one KeysetPage of ``queryset`` ordered by ``ordering`` (e.g. '-price').
+
+    The pk is used as a tie-breaker so rows sharing a sort value are never
+    skipped or repeated between pages.
+    """
+    desc = ordering.startswith('-')
+    field = ordering.lstrip('-')
+    op = 'lt' if desc else 'gt'
+    queryset = queryset.order_by(ordering, '-pk' if desc else 'pk')
+
+    key = decode_cursor(cursor)
+    if key:
+        value, pk = key
+        try:
+            queryset = queryset.filter(
+                Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+            )
+        except (ValidationError, ValueError, TypeError):
+            pass  # tampered cursor — fall back to the first page
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, field), last.pk])
+    return KeysetPage(rows, next_cursor)
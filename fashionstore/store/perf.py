@@ -0,0 +1,139 @@
+import contextvars
+import hashlib
+import re
+import time
+from collections import Counter
+
+from django.template.base import Template
+
+
+# ─── REQUEST STATS ────────────────────────────────────────────────────────────
+# What one request cost: every SQL statement (timed through
+# connection.execute_wrapper) and the time spent rendering templates. The
+# middleware in store.middleware installs one per request.
+
+# a statement shape seen this many times in one request counts as repeated;
+# two is common and harmless (the size and colour facet queries share a shape)
+DUPLICATE_THRESHOLD = 3
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+
+_current = contextvars.ContextVar('request_stats', default=None)
+
+
+def fingerprint(sql):
+    """Collapse a statement to its shape: ``IN (%s, %s, %s)`` becomes ``IN (...)``.
+
+    Django keeps parameters out of the SQL text, so two statements with the
+    same fingerprint differ only in their values; more than one of them in a
+    request usually means an N+1 loop.
+    """
+    return _IN_LIST.sub('(...)', sql)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.fingerprints = Counter()
+        self.samples = {}  # fingerprint -> first SQL seen, for logs
+        self.rendering = False
+        self.streaming = False  # set while a streamed body is being read
+        self.stream_queries = 0
+        self.count_stream = True  # False: the view's budget leaves its streamed body out
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - start
+            self.queries += 1
+            self.stream_queries += self.streaming
+            # only reads count toward repeats: writes are usually one per row
+            # on purpose (rollup counters), and BEGIN/SAVEPOINT always repeat;
+            # so do the batches of an unbudgeted streamed body
+            if sql.lstrip()[:6].upper() == 'SELECT' and (self.count_stream or not self.streaming):
+                shape = fingerprint(sql)
+                self.fingerprints[shape] += 1
+                self.samples.setdefault(shape, sql)
+
+    @property
+    def budgeted_queries(self):
+        return self.queries if self.count_stream else self.queries - self.stream_queries
+
+    @property
+    def duplicates(self):
+        """``[(fingerprint_id, count, sql)]`` for repeated statements, worst first."""
+        return [
+            (hashlib.sha1(shape.encode()).hexdigest()[:8], count, self.samples[shape])
+            for shape, count in self.fingerprints.most_common() if count >= DUPLICATE_THRESHOLD
+        ]
+
+    @property
+    def duplicate_queries(self):
+        return sum(count - 1 for count in self.fingerprints.values() if count >= DUPLICATE_THRESHOLD)
+
+    def activate(self):
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current.reset(token)
+
+
+# ─── TEMPLATE TIMING ──────────────────────────────────────────────────────────
+# Django has no render hook outside the test runner, so Template.render is
+# wrapped once. Only the outermost render is timed: {% include %} and
+# {% extends %} render nested templates inside it.
+
+_original_render = Template.render
+
+
+def _timed_render(self, context):
+    stats = _current.get()
+    if stats is None or stats.rendering:
+        return _original_render(self, context)
+    stats.rendering = True
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        stats.template_seconds += time.perf_counter() - start
+        stats.rendering = False
+
+
+def install_template_timing():
+    Template.render = _timed_render
+
+
+# ─── QUERY BUDGETS ────────────────────────────────────────────────────────────
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit, count_stream=True):
+    """Declare the most queries a view may run for one request.
+
+    Put it above the login decorators so it marks the view Django calls.
+    The middleware logs a warning when a request goes over, and the test
+    suite fails on it (``assertQueryBudget`` in store/tests.py).
+
+    A streamed body is read after the view returns, and its queries count
+    toward the budget too. ``count_stream=False`` exempts them, for bodies
+    whose queries grow with the rows they stream; they are still counted
+    and logged.
+    """
+    def decorator(view_func):
+        view_func.query_budget = limit
+        view_func.query_budget_counts_stream = count_stream
+        return view_func
+    return decorator
+
+
+def over_budget(stats, budget):
+    if budget is not None and stats.budgeted_queries > budget:
+        return f'{stats.budgeted_queries} queries, budget {budget}'
+    return None
@@ -0,0 +1,125 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from .models import Cart, PromoCode
+
+
+FREE_SHIPPING_THRESHOLD = Decimal('200')
+SHIPPING_FEE = Decimal('12')
+TAX_RATE = Decimal('0.08')
+CENT = Decimal('0.01')
+
+SESSION_QUOTE_KEY = 'cart_quote'
+CART_VERSION_KEY = 'cart_version'
+
+
+def money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+# ─── QUOTE ────────────────────────────────────────────────────────────────────
+# The one place cart totals are computed. cart.html, checkout.html and order
+# creation all read the same Quote, in exact Decimal arithmetic.
+
+class Quote:
+    FIELDS = ('subtotal', 'shipping', 'tax', 'discount', 'total')
+
+    def __init__(self, lines, subtotal, shipping, tax, discount, total, promo_code='', discount_pct=0):
+        self.lines = lines
+        self.subtotal = subtotal
+        self.shipping = shipping
+        self.tax = tax
+        self.discount = discount
+        self.total = total
+        self.promo_code = promo_code
+        self.discount_pct = discount_pct
+
+    def context(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def to_dict(self):
+        return {
+            **{field: str(getattr(self, field)) for field in self.FIELDS},
+            'lines': [{**line, 'unit_price': str(line['unit_price']), 'line_total': str(line['line_total'])}
+                      for line in self.lines],
+            'promo_code': self.promo_code,
+            'discount_pct': self.discount_pct,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        lines = [{**line, 'unit_price': Decimal(line['unit_price']), 'line_total': Decimal(line['line_total'])}
+                 for line in data['lines']]
+        return cls(lines, *(Decimal(data[field]) for field in cls.FIELDS),
+                   promo_code=data['promo_code'], discount_pct=data['discount_pct'])
+
+
+def build_quote(cart_items, promo=None):
+    lines = []
+    subtotal = Decimal('0.00')
+    for item in cart_items:
+        unit_price = money(item.product.price)
+        line_total = unit_price * item.quantity
+        subtotal += line_total
+        lines.append({
+            'id': item.pk,
+            'product_id': item.product_id,
+            'name': item.product.name,
+            'size': item.size,
+            'color': item.color,
+            'quantity': item.quantity,
+            'unit_price': unit_price,
+            'line_total': line_total,
+        })
+    shipping = money(0 if subtotal >= FREE_SHIPPING_THRESHOLD else SHIPPING_FEE)
+    tax = money(subtotal * TAX_RATE)
+    discount_pct = promo.discount_pct if promo else 0
+    discount = money(subtotal * discount_pct / 100)
+    return Quote(
+        lines, subtotal, shipping, tax, discount, subtotal + shipping + tax - discount,
+        promo_code=promo.code if promo else '', discount_pct=discount_pct,
+    )
+
+
+def active_promo(code):
+    if not code:
+        return None
+    return PromoCode.objects.filter(code=code, is_active=True).first()
+
+
+# ─── SESSION MEMO ─────────────────────────────────────────────────────────────
+# Every cart mutation bumps the session's cart version; a quote stored for the
+# current (version, promo code) pair is reused without reading the cart. The
+# promo itself is looked up again each time: an admin may have deactivated or
+# changed it, and place_order would charge without the memo's discount.
+
+def _line_keys(lines):
+    return [(line['id'], line['quantity'], line['unit_price']) for line in lines]
+
+
+def _item_keys(cart_items):
+    return [(item.pk, item.quantity, money(item.product.price)) for item in cart_items]
+
+
+def bump_cart_version(request):
+    request.session[CART_VERSION_KEY] = request.session.get(CART_VERSION_KEY, 0) + 1
+    request.session.pop(SESSION_QUOTE_KEY, None)
+
+
+def get_quote(request, cart_key, cart_items=None):
+    version = request.session.get(CART_VERSION_KEY, 0)
+    promo_code = request.session.get('promo_code', '')
+    promo = active_promo(promo_code)
+    memo = request.session.get(SESSION_QUOTE_KEY)
+    if (memo and memo['version'] == version and memo['promo'] == promo_code
+            and memo['quote']['discount_pct'] == (promo.discount_pct if promo else 0)):
+        quote = Quote.from_dict(memo['quote'])
+        # rows the caller already loaded also catch changes made outside this
+        # session, such as an admin repricing a product
+        if cart_items is None or _line_keys(quote.lines) == _item_keys(cart_items):
+            return quote
+
+    if cart_items is None:
+        cart_items = Cart.objects.filter(session_key=cart_key).select_related('product').order_by('pk')
+    quote = build_quote(cart_items, promo)
+    request.session[SESSION_QUOTE_KEY] = {'version': version, 'promo': promo_code, 'quote': quote.to_dict()}
+    return quote
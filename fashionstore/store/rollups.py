@@ -0,0 +1,244 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.apps import apps as global_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import User, Product, Order, Rollup
+
+
+REVENUE_STATUSES = ('shipped', 'delivered')
+CHART_MONTHS = 12
+
+
+# ─── KEYS ─────────────────────────────────────────────────────────────────────
+# Every metric is a (count, amount) pair under a string key:
+#
+#   orders, orders:<status>              all-time order count / total
+#   orders:<YYYY-MM-DD>                  orders placed that day
+#   revenue, revenue:<YYYY-MM>           shipped + delivered orders
+#   customers, customers:<status>        customer accounts
+#   products, products:<status>          products (amount = sum of prices)
+#
+# A row only ever changes by the difference between an object's old and new
+# contribution, so reading any metric is one indexed lookup however many
+# orders exist.
+
+def local_date(value=None):
+    value = value or timezone.now()
+    return (timezone.localtime(value) if timezone.is_aware(value) else value).date()
+
+
+def day_key(day):
+    return day.strftime('%Y-%m-%d')
+
+
+def month_key(day):
+    return day.strftime('%Y-%m')
+
+
+def order_keys(status, day):
+    keys = ['orders', f'orders:{status}', f'orders:{day_key(day)}']
+    if status in REVENUE_STATUSES:
+        keys += ['revenue', f'revenue:{month_key(day)}']
+    return keys
+
+
+def user_keys(role, status):
+    return ['customers', f'customers:{status}'] if role == 'customer' else []
+
+
+def product_keys(status):
+    return ['products', f'products:{status}']
+
+
+TRACKED_FIELDS = {
+    Order: ('status', 'total', 'created_at'),
+    User: ('role', 'status'),
+    Product: ('status', 'price'),
+}
+
+
+def _amount(value):
+    return Decimal(str(value or 0))
+
+
+def _contributions(instance):
+    if isinstance(instance, Order):
+        keys, amount = order_keys(instance.status, local_date(instance.created_at)), instance.total
+    elif isinstance(instance, User):
+        keys, amount = user_keys(instance.role, instance.status), 0
+    else:
+        keys, amount = product_keys(instance.status), instance.price
+    return {key: (1, _amount(amount)) for key in keys}
+
+
+# ─── INCREMENTAL UPDATES ──────────────────────────────────────────────────────
+
+def apply(deltas):
+    """Add ``{key: (count, amount)}`` to the stored rollups."""
+    deltas = {k: v for k, v in deltas.items() if v != (0, 0)}
+    with transaction.atomic():
+        # sorted so concurrent writers lock rows in the same order
+        for key in sorted(deltas):
+            count, amount = deltas[key]
+            changes = {'count': F('count') + count, 'amount': F('amount') + amount}
+            if Rollup.objects.filter(key=key).update(**changes):
+                continue
+            try:
+                with transaction.atomic():
+                    Rollup.objects.create(key=key, count=count, amount=amount)
+            except IntegrityError:  # another writer created it first
+                Rollup.objects.filter(key=key).update(**changes)
+
+
+def _diff(old, new):
+    deltas = defaultdict(lambda: (0, 0))
+    for sign, contributions in ((-1, old), (1, new)):
+        for key, (count, amount) in contributions.items():
+            c, a = deltas[key]
+            deltas[key] = (c + sign * count, a + sign * amount)
+    return deltas
+
+
+def _record(old, new):
+    # inside the writer's transaction rather than on commit: the delta lands
+    # atomically with the row it describes, so rebuild() never sees one
+    # without the other (and a rolled-back save rolls the delta back too)
+    apply(_diff(old, new))
+
+
+def _tracked(sender, instance):
+    return {f: getattr(instance, f) for f in TRACKED_FIELDS[sender]}
+
+
+@receiver(post_init, sender=Order)
+@receiver(post_init, sender=User)
+@receiver(post_init, sender=Product)
+def _snapshot(sender, instance, **kwargs):
+    # the tracked values as loaded; left unset when .only()/.defer() skipped
+    # one, since reading it here would cost a query per instance
+    loaded = instance.__dict__
+    if all(f in loaded for f in TRACKED_FIELDS[sender]):
+        instance._rollup_loaded = _tracked(sender, instance)
+
+
+@receiver(pre_save, sender=Order)
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Product)
+def _remember_old(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._rollup_old = None  # None: no tracked field changes, nothing to apply
+    if raw:
+        return
+    if instance._state.adding or instance.pk is None:
+        instance._rollup_old = {}
+        return
+    if update_fields is not None and not set(update_fields) & set(TRACKED_FIELDS[sender]):
+        return
+    if getattr(instance, '_rollup_loaded', None) == _tracked(sender, instance):
+        return
+    # locked until the save commits (the models save atomically), so a
+    # concurrent update of the same row waits and diffs against our new value
+    # instead of applying the same delta twice
+    old = sender.objects.select_for_update().filter(pk=instance.pk).only(*TRACKED_FIELDS[sender]).first()
+    instance._rollup_old = _contributions(old) if old else {}
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Product)
+def _on_save(sender, instance, raw=False, **kwargs):
+    old = getattr(instance, '_rollup_old', None)
+    if raw or old is None:
+        return
+    _record(old, _contributions(instance))
+    instance._rollup_loaded = _tracked(sender, instance)
+
+
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Product)
+def _on_delete(sender, instance, **kwargs):
+    _record(_contributions(instance), {})
+
+
+# ─── READING ──────────────────────────────────────────────────────────────────
+
+class Metric:
+    def __init__(self, count=0, amount=Decimal('0.00')):
+        self.count = count
+        self.amount = amount
+
+    @property
+    def average(self):
+        return self.amount / self.count if self.count else Decimal('0.00')
+
+
+def read(keys):
+    """Return ``{key: Metric}`` for ``keys`` in one query; missing keys read as zero."""
+    rows = Rollup.objects.filter(key__in=keys).values_list('key', 'count', 'amount')
+    metrics = {key: Metric() for key in keys}
+    for key, count, amount in rows:
+        metrics[key] = Metric(count, amount)
+    return metrics
+
+
+def recent_months(today, months=CHART_MONTHS):
+    year, month = today.year, today.month
+    days = []
+    for _ in range(months):
+        days.append(today.replace(year=year, month=month, day=1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return list(reversed(days))
+
+
+# ─── REBUILD ──────────────────────────────────────────────────────────────────
+
+def rebuild(apps=global_apps):
+    """Recompute every rollup from the source tables with grouped queries.
+
+    Takes an app registry so the initial migration can backfill with
+    historical models.
+    """
+    Order = apps.get_model('store', 'Order')
+    User = apps.get_model('store', 'User')
+    Product = apps.get_model('store', 'Product')
+    Rollup = apps.get_model('store', 'Rollup')
+
+    totals = defaultdict(lambda: [0, Decimal('0.00')])
+
+    def add(keys, count, amount):
+        for key in keys:
+            totals[key][0] += count
+            totals[key][1] += _amount(amount)
+
+    with transaction.atomic():
+        # Lock every rollup row (and, on MySQL, the gaps between them) in key
+        # order, the order apply() locks in, before reading anything. A writer
+        # that already applied its delta has committed by the time the lock is
+        # ours, so the counts below include its row; one that comes later
+        # waits and adds its delta on top of the new rows.
+        list(Rollup.objects.select_for_update().order_by('key').values_list('pk', flat=True))
+
+        orders = (
+            Order.objects.order_by().annotate(day=TruncDate('created_at'))
+            .values('day', 'status').annotate(n=Count('pk'), amount=Sum('total'))
+        )
+        for row in orders:
+            add(order_keys(row['status'], row['day']), row['n'], row['amount'])
+        for row in User.objects.order_by().values('role', 'status').annotate(n=Count('pk')):
+            add(user_keys(row['role'], row['status']), row['n'], 0)
+        for row in Product.objects.order_by().values('status').annotate(n=Count('pk'), amount=Sum('price')):
+            add(product_keys(row['status']), row['n'], row['amount'])
+
+        Rollup.objects.all().delete()
+        Rollup.objects.bulk_create(
+            [Rollup(key=key, count=count, amount=amount) for key, (count, amount) in totals.items()],
+            batch_size=1000,
+        )
+    return len(totals)
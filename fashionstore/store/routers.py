@@ -0,0 +1,125 @@
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+
+# ─── READ REPLICAS ────────────────────────────────────────────────────────────
+# Catalog and reporting reads (REPLICATED_MODELS) go to one of
+# settings.DATABASE_REPLICAS; everything else, every write, and every read
+# inside a transaction stay on 'default'.
+#
+# Reads only leave the primary where it is safe to see data a moment old:
+# inside a request (store.middleware.ReplicaPinningMiddleware turns it on)
+# or inside replica_reads(). Management commands and the task worker read
+# from the primary unless they opt in, so read-then-write code such as the
+# product import never acts on a stale row.
+#
+# Read-your-writes: once a request writes a replicated model, the rest of
+# that request and the same browser's requests for REPLICA_STICKY_SECONDS
+# read from the primary, so the order confirmation page after a checkout or
+# the product list after an edit always shows the change. The pin is a
+# cookie of its own, not a session value: reading the session would cost a
+# query and add Vary: Cookie to every response, public API ones included.
+#
+# One replica per request: the catalog version (CacheVersion) is replicated
+# with the catalog and all of a request's reads use the same replica, so a
+# lagging replica never pairs a new version with old rows in the cache or
+# an API ETag.
+
+PRIMARY = 'default'
+REPLICATED_MODELS = {'product', 'category', 'productfacet', 'order', 'orderitem', 'rollup', 'cacheversion'}
+RETRY_AFTER = 30  # seconds before a replica that failed to connect is tried again
+PIN_COOKIE = 'db_pinned_until'
+
+
+class _Routing:
+    def __init__(self, replicas=False):
+        self.replicas = replicas  # may reads use a replica at all
+        self.pinned = False       # read-your-writes: primary only
+        self.wrote = False
+        self.replica = None       # chosen on the first replica read
+
+
+_routing = contextvars.ContextVar('db_routing', default=None)
+_down_until = {}  # replica alias -> monotonic time it may be retried
+_down_lock = threading.Lock()
+
+
+def _replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _usable(alias):
+    with _down_lock:
+        if _down_until.get(alias, 0) > time.monotonic():
+            return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        with _down_lock:
+            _down_until[alias] = time.monotonic() + RETRY_AFTER
+        return False
+    return True
+
+
+def pick_replica():
+    """A reachable replica alias, or PRIMARY when none is configured or up."""
+    candidates = _replica_aliases()
+    for alias in random.sample(candidates, len(candidates)):
+        if _usable(alias):
+            return alias
+    return PRIMARY
+
+
+@contextmanager
+def replica_reads(pinned=False):
+    """Let catalog and reporting reads in this block use a replica (unless ``pinned``)."""
+    state = _Routing(replicas=True)
+    state.pinned = pinned
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Read everything from the primary in this block, e.g. before writing based on it."""
+    token = _routing.set(_Routing(replicas=False))
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if (state is None or not state.replicas or state.pinned or state.wrote
+                or model._meta.model_name not in REPLICATED_MODELS or not _replica_aliases()):
+            return PRIMARY
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        if state.replica is None:
+            state.replica = pick_replica()
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None and model._meta.model_name in REPLICATED_MODELS:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # replicas hold the same rows as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema through replication
+        return False if db in _replica_aliases() else None
+
@@ -0,0 +1,104 @@
+import html
+import re
+from contextlib import contextmanager
+
+from django.test import Client
+from django.utils import timezone
+
+from .models import User, Product, Order, Cart
+from .views import hash_password
+
+
+# ─── VIEW SCENARIOS ───────────────────────────────────────────────────────────
+# One request per page in store/urls.py, shared by `benchmark views` and the
+# query budget tests so both exercise the same traffic.
+
+BENCH_USERNAME = 'bench_customer'
+BENCH_PASSWORD = 'bench'
+
+
+def view_scenarios():
+    """``(product, [(name, who, method, url, data, setup), ...])``.
+
+    ``who`` is 'customer' or 'admin'; ``method`` is passed to ``send``;
+    ``setup`` (or None) runs untimed before each request. The 'shop page 2' url is None until ``shop_page_two``
+    fills it in. Raises LookupError when there are no active products.
+    """
+    product = Product.objects.filter(status='active').order_by('-stock').first()
+    if product is None:
+        raise LookupError('no active products; run seed_data first.')
+    category = product.category_id or ''
+    order_status = 'pending'
+
+    def fill_cart(client):
+        client.post(f'/cart/add/{product.pk}/', {'size': 'M', 'color': 'Black'})
+
+    checkout_form = {'full_name': 'Bench Shopper', 'address': '1 Bench St', 'city': 'Bench',
+                     'pincode': '00000', 'payment_method': 'card'}
+    return product, [
+        ('home', 'customer', 'get', '/home/', None, None),
+        ('shop', 'customer', 'get', '/shop/', None, None),
+        ('shop size', 'customer', 'get', '/shop/?size=M', None, None),
+        ('shop color+price_asc', 'customer', 'get', '/shop/?color=Black&sort=price_asc', None, None),
+        ('shop category+range', 'customer', 'get', f'/shop/?category={category}&min_price=50&max_price=200', None, None),
+        ('shop search', 'customer', 'get', '/shop/?q=silk dress', None, None),
+        ('shop page 2', 'customer', 'get', None, None, None),
+        ('search suggest', 'customer', 'get', '/search/suggest/?q=sil', None, None),
+        ('product detail', 'customer', 'get', f'/product/{product.pk}/', None, None),
+        ('cart add', 'customer', 'post', f'/cart/add/{product.pk}/', {'size': 'M', 'color': 'Black'}, None),
+        ('cart add json', 'customer', 'post json', f'/cart/add/{product.pk}/', {'size': 'M', 'color': 'Black'}, None),
+        ('cart', 'customer', 'get', '/cart/', None, None),
+        ('checkout', 'customer', 'get', '/checkout/', None, fill_cart),
+        ('checkout place order', 'customer', 'post', '/checkout/', checkout_form, fill_cart),
+        ('user orders', 'customer', 'get', '/orders/', None, None),
+        ('api products', 'customer', 'get', '/api/v1/products/', None, None),
+        ('api products filtered', 'customer', 'get', '/api/v1/products/?size=M&sort=price_asc&fields=id,name,price', None, None),
+        ('api product', 'customer', 'get', f'/api/v1/products/{product.pk}/', None, None),
+        ('api categories', 'customer', 'get', '/api/v1/categories/', None, None),
+        ('admin dashboard', 'admin', 'get', '/admin-dashboard/', None, None),
+        ('admin products', 'admin', 'get', '/admin-products/', None, None),
+        ('admin products search', 'admin', 'get', '/admin-products/?q=silk', None, None),
+        ('admin product edit', 'admin', 'get', f'/admin-products/edit/{product.pk}/', None, None),
+        ('admin orders', 'admin', 'get', '/admin-orders/', None, None),
+        ('admin orders status', 'admin', 'get', f'/admin-orders/?status={order_status}', None, None),
+        ('admin orders export', 'admin', 'get', f'/admin-orders/export/?status={order_status}&from={timezone.now():%Y-%m-%d}', None, None),
+        ('admin users', 'admin', 'get', '/admin-users/', None, None),
+        ('admin users search', 'admin', 'get', '/admin-users/?q=emma', None, None),
+    ]
+
+
+def send(client, method, url, data=None):
+    """Make one scenario request; a ``method`` such as 'post json' asks for a JSON reply."""
+    method, _, reply = method.partition(' ')
+    extra = {'HTTP_ACCEPT': 'application/json'} if reply == 'json' else {}
+    return getattr(client, method)(url, data or {}, **extra)
+
+
+def shop_page_two(client):
+    """The shop's next-page url as rendered on page one, or None if there is one page."""
+    link = re.search(r'href="\?([^"]*cursor=[^"]*)"', client.get('/shop/').content.decode())
+    return f'/shop/?{html.unescape(link.group(1))}' if link else None
+
+
+@contextmanager
+def bench_clients():
+    """Logged-in ``{'customer': Client, 'admin': Client}``; tidies up after itself.
+
+    The customer is a throwaway account whose orders are deleted on exit,
+    along with both clients' carts.
+    """
+    bench_user, _ = User.objects.get_or_create(
+        username=BENCH_USERNAME,
+        defaults={'name': 'Bench Shopper', 'email': 'bench@example.com', 'password': hash_password(BENCH_PASSWORD)},
+    )
+    clients = {'customer': Client(), 'admin': Client()}
+    clients['customer'].post('/login/', {'username': BENCH_USERNAME, 'password': BENCH_PASSWORD})
+    clients['admin'].post('/login/', {'username': 'admin', 'password': 'admin'})
+    try:
+        yield clients
+    finally:
+        Cart.objects.filter(session_key__in=[
+            c.session.get('cart_key') for c in clients.values() if c.session.get('cart_key')
+        ]).delete()
+        Order.objects.filter(user=bench_user).delete()
+        bench_user.delete()
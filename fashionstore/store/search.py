@@ -0,0 +1,100 @@
+import re
+from functools import reduce
+from operator import add, and_, or_
+
+from django.db.models import Case, FloatField, Func, Q, Value, When
+from django.db.models.lookups import GreaterThan, IContains
+
+
+# ─── PRODUCT SEARCH ───────────────────────────────────────────────────────────
+# On MySQL, queries go through the FULLTEXT indexes created in migration 0003
+# (MATCH ... AGAINST in boolean mode, every term required, prefix-matched).
+# MySQL keeps those indexes current on every INSERT/UPDATE/DELETE, so product
+# saves need no extra work. Other backends (SQLite in development and tests)
+# compile the same expression to one LIKE per term and column, with a
+# name-over-description ranking.
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+ES_AFTER = ('ss', 'x', 'z', 'ch', 'sh', 'i')  # dresses, boxes, watches, accessories; not shoes
+MAX_TERMS = 8
+SEARCH_COLUMNS = ('name', 'description')
+
+
+class MatchAgainst(Func):
+    """Relevance of ``columns`` to ``terms``: above 0 only when every term matches."""
+    output_field = FloatField()
+
+    def __init__(self, *columns, terms):
+        self.terms = terms
+        super().__init__(*columns)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(
+            compiler, connection,
+            template='MATCH (%(expressions)s) AGAINST (%%s IN BOOLEAN MODE)',
+            **extra_context
+        )
+        return sql, (*params, boolean_query(self.terms))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # LIKE fallback; earlier columns weigh more, so a hit in the name beats
+        # one in the description
+        columns = self.get_source_expressions()
+        scores, every_term = [], []
+        for term in self.terms:
+            hits = [IContains(column, term) for column in columns]
+            scores.append(Case(
+                *[When(hit, then=Value(float(len(columns) - i))) for i, hit in enumerate(hits)],
+                default=Value(0.0),
+            ))
+            every_term.append(reduce(or_, (Q(hit) for hit in hits)))
+        fallback = Case(
+            When(reduce(and_, every_term), then=reduce(add, scores)),
+            default=Value(0.0), output_field=FloatField(),
+        )
+        return compiler.compile(fallback.resolve_expression(compiler.query))
+
+
+def stem(token):
+    if token.endswith('ss'):
+        return token
+    for suffix in ('ing', 'ed'):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    if token.endswith('es') and token[:-2].endswith(ES_AFTER) and len(token) >= 5:
+        return token[:-2]
+    if token.endswith('s') and len(token) >= 4:
+        return token[:-1]
+    return token
+
+
+def search_terms(text):
+    terms = []
+    for token in TOKEN_RE.findall((text or '').lower()):
+        term = stem(token)
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def boolean_query(terms):
+    return ' '.join(f'+{t}*' for t in terms)
+
+
+def search_products(products, text, columns=SEARCH_COLUMNS):
+    terms = search_terms(text)
+    if not terms:
+        return products
+    return products.filter(GreaterThan(MatchAgainst(*columns, terms=terms), 0))
+
+
+def rank_products(products, text, columns=SEARCH_COLUMNS):
+    terms = search_terms(text)
+    if not terms:
+        return products.annotate(relevance=Value(0.0, output_field=FloatField()))
+    return products.annotate(relevance=MatchAgainst(*columns, terms=terms))
+
+
+def suggest(products, text, limit=8):
+    ranked = rank_products(search_products(products, text, ('name',)), text, ('name',))
+    return list(ranked.order_by('-relevance', 'name').values('id', 'name')[:limit])
@@ -0,0 +1,28 @@
+import hashlib
+
+
+class CoalescingSessionMixin:
+    """Skip the session write when the data is unchanged since it was loaded.
+
+    SessionMiddleware saves whenever ``session.modified`` is set, which also
+    happens when a view writes back a value it just read or a flash message is
+    added and consumed within the same session state. Comparing a digest of the
+    serialized data turns those into no-ops.
+    """
+
+    _loaded_digest = None
+
+    def _digest(self, data):
+        return hashlib.sha1(self.serializer().dumps(data)).hexdigest()
+
+    def load(self):
+        data = super().load()
+        self._loaded_digest = self._digest(data)
+        return data
+
+    def save(self, must_create=False):
+        if not must_create and self.session_key and self._loaded_digest is not None:
+            if self._digest(self._get_session(no_load=True)) == self._loaded_digest:
+                return
+        super().save(must_create=must_create)
+        self._loaded_digest = self._digest(self._get_session(no_load=True))
@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.cache import SessionStore as CacheSessionStore
+
+from .base import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, CacheSessionStore):
+    pass
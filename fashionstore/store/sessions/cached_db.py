@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBSessionStore
+
+from .base import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, CachedDBSessionStore):
+    pass
@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+
+from .base import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, DBSessionStore):
+    pass
@@ -0,0 +1,253 @@
+import hashlib
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .ids import generate_order_ids
+from .models import User, Category, Product, ProductFacet, Order, OrderItem, Cart, PromoCode
+from .pricing import FREE_SHIPPING_THRESHOLD, SHIPPING_FEE, TAX_RATE, money
+
+
+# ─── SYNTHETIC LOAD-TEST DATA ─────────────────────────────────────────────────
+# Generates users, products, abandoned carts and orders with skewed, roughly
+# production-shaped distributions:
+#
+#   product popularity   Zipf (s=1.1): a few best sellers, a long tail
+#   orders per customer  Zipf (s=1.3): most order once, some order a lot
+#   order dates          skewed towards recent days (a growing store)
+#   order status         by age: recent orders pending/shipped, old delivered
+#   items per order      1 (60%), 2 (25%), 3 (10%), 4 (5%)
+#   prices               log-normal around $80
+#
+# The same seed always produces the same rows (dates are relative to now, and
+# order ids come from store.ids so they stay unique across runs). Everything is written with
+# bulk_create in one transaction per batch, so 1M orders take minutes.
+
+FIRST_NAMES = ['Sarah', 'Michael', 'Emma', 'James', 'Olivia', 'Liam', 'Ava', 'Noah', 'Mia', 'Lucas',
+               'Sofia', 'Ethan', 'Isla', 'Mateo', 'Zara', 'Arjun', 'Priya', 'Chen', 'Yuki', 'Elena']
+LAST_NAMES = ['Jenkins', 'Chen', 'Wilson', 'Smith', 'Brown', 'Johnson', 'Garcia', 'Patel', 'Kim',
+              'Rodriguez', 'Nguyen', 'Müller', 'Rossi', 'Sato', 'Khan', 'Silva', 'Novak', 'Ali']
+ADJECTIVES = ['Midnight', 'Floral', 'Velvet', 'Chiffon', 'Lace', 'Silk', 'Linen', 'Satin', 'Boho',
+              'Classic', 'Emerald', 'Rosé', 'Pleated', 'Tiered', 'Ruched', 'Wrap', 'Sequin', 'Denim']
+GARMENTS = {
+    'women': ['Gown', 'Maxi', 'Mini', 'Midi', 'Sundress', 'Cocktail Dress', 'Slip Dress', 'Jumpsuit'],
+    'men': ['Suit', 'Blazer', 'Shirt', 'Chinos', 'Overcoat'],
+    'kids': ['Party Dress', 'Tuxedo Set', 'Romper', 'Pinafore'],
+    'accessories': ['Tote Bag', 'Earrings', 'Scarf', 'Clutch', 'Belt'],
+}
+SIZE_SETS = ['XS,S,M,L', 'S,M,L,XL', 'XS,S,M,L,XL,XXL', 'S,M,L']
+COLORS = ['Black', 'White', 'Navy', 'Blush', 'Burgundy', 'Emerald', 'Ivory', 'Champagne', 'Red',
+          'Olive', 'Sand', 'Teal', 'Silver', 'Rose', 'Charcoal', 'Lilac']
+CITIES = ['Los Angeles', 'New York', 'Chicago', 'Houston', 'Phoenix', 'Miami', 'Seattle',
+          'Boston', 'Denver', 'Austin', 'Atlanta', 'Portland']
+PAYMENTS = ['card'] * 6 + ['upi'] * 3 + ['cod']
+ITEMS_PER_ORDER = [1] * 12 + [2] * 5 + [3] * 2 + [4]
+
+
+def zipf_cumulative(n, s):
+    total, cumulative = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1 / rank ** s
+        cumulative.append(total)
+    return cumulative
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at values we generated."""
+    fields = [f for m in models for f in m._meta.concrete_fields
+              if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class SyntheticData:
+    def __init__(self, seed=42, days=365, batch_size=5000, log=print):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.days = days
+        self.batch_size = batch_size
+        self.log = log
+        self.now = timezone.now()
+        self.prefix = f'load{seed}'
+
+    def exists(self):
+        return User.objects.filter(username__startswith=f'{self.prefix}_').exists()
+
+    def past(self, skew=1.5):
+        # rng.random() ** skew piles dates up near now, like a growing store
+        return self.now - timedelta(seconds=int(self.days * 86400 * self.rng.random() ** skew))
+
+    def _batches(self, count):
+        for start in range(0, count, self.batch_size):
+            yield start, min(self.batch_size, count - start)
+
+    def _progress(self, label, done, total, started):
+        rate = done / (time.perf_counter() - started or 1e-9)
+        self.log(f'   {label}: {done:,}/{total:,} ({rate:,.0f}/s)')
+
+    # ─── GENERATORS ───────────────────────────────────────────────────────────
+
+    def users(self, count):
+        """Create ``count`` customers; returns their (pk, name, email) rows."""
+        password = hashlib.sha256(b'password').hexdigest()
+        started = time.perf_counter()
+        for start, size in self._batches(count):
+            batch = []
+            for i in range(start, start + size):
+                first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                batch.append(User(
+                    name=f'{first} {last}', username=f'{self.prefix}_{i}',
+                    email=f'{first.lower()}.{i}@{self.prefix}.example.com', password=password,
+                    role='customer', status='blocked' if self.rng.random() < 0.02 else 'active',
+                    created_at=self.past(),
+                ))
+            with transaction.atomic(), explicit_timestamps(User):
+                User.objects.bulk_create(batch)
+            self._progress('users', start + size, count, started)
+        return list(
+            User.objects.filter(username__startswith=f'{self.prefix}_').order_by('pk')
+            .values_list('pk', 'name', 'email')
+        )
+
+    def products(self, count):
+        """Create ``count`` products with their facets; returns (pk, name, price, sizes, colors) rows."""
+        categories = dict(Category.objects.values_list('slug', 'pk'))
+        slugs = [s for s in GARMENTS if s in categories] or [None]
+        weights = [6, 2, 1, 1][:len(slugs)]
+        sku_prefix = self.prefix.upper()
+        started = time.perf_counter()
+        for start, size in self._batches(count):
+            batch = []
+            for i in range(start, start + size):
+                slug = self.rng.choices(slugs, weights)[0]
+                price = money(min(600, max(10, self.rng.lognormvariate(4.4, 0.5))))
+                on_sale = self.rng.random() < 0.3
+                batch.append(Product(
+                    sku=f'{sku_prefix}-{i:07d}',
+                    name=f'{self.rng.choice(ADJECTIVES)} {self.rng.choice(GARMENTS.get(slug, ["Dress"]))} {i}',
+                    description='Synthetic load-test product.',
+                    category_id=categories.get(slug),
+                    price=price,
+                    original_price=money(price * Decimal('1.3')) if on_sale else None,
+                    badge='SALE' if on_sale else '',
+                    stock=self.rng.randint(0, 200),
+                    sizes='' if slug == 'accessories' else self.rng.choice(SIZE_SETS),
+                    colors=','.join(self.rng.sample(COLORS, self.rng.randint(1, 4))),
+                    rating=Decimal(self.rng.randint(30, 50)) / 10,
+                    review_count=self.rng.randint(0, 500),
+                    status=self.rng.choices(['active', 'hidden', 'out_of_stock'], [90, 5, 5])[0],
+                    is_trending=self.rng.random() < 0.05,
+                    is_new_arrival=self.rng.random() < 0.1,
+                    created_at=self.past(1.0),
+                ))
+            with transaction.atomic(), explicit_timestamps(Product):
+                Product.objects.bulk_create(batch)
+                # re-read for the pks: MySQL does not return them from bulk_create
+                saved = Product.objects.filter(sku__in=[p.sku for p in batch]).only('pk', 'sizes', 'colors')
+                ProductFacet.objects.bulk_create(
+                    [f for p in saved for f in ProductFacet.build_for(p)], batch_size=self.batch_size
+                )
+            self._progress('products', start + size, count, started)
+        return list(
+            Product.objects.filter(sku__startswith=f'{sku_prefix}-').order_by('pk')
+            .values_list('pk', 'name', 'price', 'sizes', 'colors')
+        )
+
+    def _popular(self, rows, s):
+        # shuffle first so popularity is not simply pk order
+        rows = list(rows)
+        self.rng.shuffle(rows)
+        return rows, zipf_cumulative(len(rows), s)
+
+    def _line(self, product):
+        pk, name, price, sizes, colors = product
+        return {
+            'product_id': pk, 'name': name, 'price': price,
+            'size': self.rng.choice(sizes.split(',')) if sizes else 'One Size',
+            'color': self.rng.choice(colors.split(',')) if colors else '',
+            'quantity': self.rng.choices([1, 2, 3], [80, 15, 5])[0],
+        }
+
+    def carts(self, count, products):
+        """Create ``count`` cart lines spread over abandoned and live carts."""
+        products, weights = self._popular(products, 1.1)
+        started, made = time.perf_counter(), 0
+        with explicit_timestamps(Cart):
+            while made < count:
+                batch = []
+                while len(batch) < self.batch_size and made + len(batch) < count:
+                    session_key = f'{self.rng.getrandbits(128):032x}'
+                    added_at = self.past(3.0)  # most carts are fresh; a tail is long abandoned
+                    for product in self.rng.choices(products, cum_weights=weights, k=self.rng.choice(ITEMS_PER_ORDER)):
+                        line = self._line(product)
+                        batch.append(Cart(session_key=session_key, product_id=line['product_id'], size=line['size'],
+                                          color=line['color'], quantity=line['quantity'], added_at=added_at,
+                                          updated_at=added_at))
+                batch = batch[:count - made]
+                with transaction.atomic():
+                    Cart.objects.bulk_create(batch)
+                made += len(batch)
+                self._progress('cart lines', made, count, started)
+
+    def _status(self, created_at):
+        age = (self.now - created_at).days
+        if age < 2:
+            return self.rng.choices(['pending', 'shipped', 'cancelled'], [70, 25, 5])[0]
+        if age < 10:
+            return self.rng.choices(['pending', 'shipped', 'delivered', 'cancelled'], [5, 60, 30, 5])[0]
+        return self.rng.choices(['delivered', 'cancelled'], [94, 6])[0]
+
+    def orders(self, count, users, products):
+        """Create ``count`` orders with their items."""
+        users, user_weights = self._popular(users, 1.3)
+        products, product_weights = self._popular(products, 1.1)
+        promos = list(PromoCode.objects.filter(is_active=True).values_list('code', 'discount_pct'))
+        started = time.perf_counter()
+        with explicit_timestamps(Order):
+            for start, size in self._batches(count):
+                orders, lines = [], []
+                for order_id in generate_order_ids(size):
+                    user_pk, name, email = self.rng.choices(users, cum_weights=user_weights)[0]
+                    items = [self._line(p) for p in self.rng.choices(
+                        products, cum_weights=product_weights, k=self.rng.choice(ITEMS_PER_ORDER))]
+                    subtotal = sum((i['price'] * i['quantity'] for i in items), Decimal('0.00'))
+                    shipping = money(0 if subtotal >= FREE_SHIPPING_THRESHOLD else SHIPPING_FEE)
+                    tax = money(subtotal * TAX_RATE)
+                    promo_code, pct = self.rng.choice(promos) if promos and self.rng.random() < 0.1 else ('', 0)
+                    discount = money(subtotal * pct / 100)
+                    created_at = self.past()
+                    orders.append(Order(
+                        order_id=order_id, user_id=user_pk, customer_name=name, customer_email=email,
+                        shipping_address=f'{self.rng.randint(1, 999)} Fashion Ave',
+                        city=self.rng.choice(CITIES), pincode=f'{self.rng.randint(10000, 99999)}',
+                        payment_method=self.rng.choice(PAYMENTS),
+                        subtotal=subtotal, shipping_cost=shipping, tax=tax, discount=discount,
+                        total=subtotal + shipping + tax - discount, promo_code=promo_code,
+                        status=self._status(created_at), created_at=created_at, updated_at=created_at,
+                    ))
+                    lines.append(items)
+                with transaction.atomic():
+                    Order.objects.bulk_create(orders)
+                    if orders[0].pk is None:  # MySQL does not return bulk-inserted pks
+                        pks = dict(Order.objects.filter(order_id__in=[o.order_id for o in orders])
+                                   .values_list('order_id', 'pk'))
+                        for order in orders:
+                            order.pk = pks[order.order_id]
+                    OrderItem.objects.bulk_create([
+                        OrderItem(order_id=order.pk, product_id=i['product_id'], product_name=i['name'],
+                                  size=i['size'], color=i['color'], quantity=i['quantity'], price=i['price'])
+                        for order, items in zip(orders, lines) for i in items
+                    ], batch_size=self.batch_size)
+                self._progress('orders', start + size, count, started)
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import exports, importers, rollups, thumbnails
+from .models import Category, Product, Task
+from .routers import replica_reads
+
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+CLAIM_BATCH = 10
+LEASE = timedelta(minutes=15)  # a running task without a heartbeat for this long lost its worker
+HEARTBEAT = timedelta(minutes=1)  # how often a running task renews its lease
+RETRY_DELAY = timedelta(seconds=30)  # doubled after every failed attempt
+KEEP_FINISHED = timedelta(days=7)
+MAX_ERROR_LENGTH = 4000
+IMPORT_ERRORS_SHOWN = 20
+
+
+# ─── QUEUE ────────────────────────────────────────────────────────────────────
+# A table-backed queue: no broker to run, and a task enqueued inside a
+# transaction only becomes visible if that transaction commits. Workers claim
+# a task with a conditional UPDATE (status queued -> running), so any number
+# of `run_worker` processes can share the table without double-running one.
+# While a task runs, a heartbeat thread renews its lease, so a long export is
+# never mistaken for one whose worker died.
+
+def task(name, max_attempts=3, on_prune=None):
+    """Register a function as a background task under ``name``.
+
+    ``on_prune(result, payload)`` runs when a finished task's row is pruned,
+    to delete whatever it left behind (e.g. a file).
+    """
+    def decorator(fn):
+        fn.task_name = name
+        fn.max_attempts = max_attempts
+        fn.on_prune = on_prune
+        REGISTRY[name] = fn
+        return fn
+    return decorator
+
+
+def enqueue(name, unique=False, delay=None, **payload):
+    """Queue ``name`` with JSON-serialisable keyword arguments.
+
+    ``unique`` skips the insert when an identical task is still waiting,
+    so repeated triggers (e.g. rollup refreshes) collapse into one run.
+    With TASKS_EAGER the task runs in-process after commit instead.
+    """
+    fn = REGISTRY[name]  # an unknown name fails here, not in the worker
+    if getattr(settings, 'TASKS_EAGER', False):
+        transaction.on_commit(lambda: fn(**payload))
+        return None
+    dedupe_key = ''
+    if unique:
+        dedupe_key = hashlib.sha1(json.dumps([name, payload], sort_keys=True).encode()).hexdigest()
+        waiting = Task.objects.filter(dedupe_key=dedupe_key, status=Task.QUEUED).first()
+        if waiting:
+            return waiting
+    return Task.objects.create(
+        name=name, payload=payload, dedupe_key=dedupe_key, max_attempts=fn.max_attempts,
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker):
+    """Mark the next due task as running for ``worker`` and return it, or None."""
+    now = timezone.now()
+    due = (
+        Task.objects.filter(status=Task.QUEUED, run_after__lte=now)
+        .order_by('run_after', 'pk').values_list('pk', flat=True)[:CLAIM_BATCH]
+    )
+    for pk in due:
+        claimed = Task.objects.filter(pk=pk, status=Task.QUEUED).update(
+            status=Task.RUNNING, locked_by=worker, started_at=now, heartbeat_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+@contextmanager
+def heartbeat(job):
+    """Renew ``job``'s lease every HEARTBEAT until the block exits."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(HEARTBEAT.total_seconds()):
+                try:
+                    Task.objects.filter(pk=job.pk, status=Task.RUNNING, locked_by=job.locked_by).update(
+                        heartbeat_at=timezone.now()
+                    )
+                except Exception:
+                    # a dropped connection or a lock timeout must not stop the
+                    # heartbeat, or the task is reclaimed while still running
+                    logger.exception('heartbeat for task %s #%s failed; retrying', job.name, job.pk)
+                    connection.close()  # reconnect on the next beat
+        finally:
+            connection.close()  # this thread's own connection
+
+    thread = threading.Thread(target=beat, name=f'heartbeat-{job.pk}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run(job):
+    """Run a claimed task and record the outcome; returns True on success."""
+    fn = REGISTRY.get(job.name)
+    # only while it is still ours: requeue_stale may have handed it on
+    mine = Task.objects.filter(pk=job.pk, status=Task.RUNNING, locked_by=job.locked_by)
+    try:
+        if fn is None:
+            raise LookupError(f'No task registered as {job.name!r}')
+        with heartbeat(job):
+            result = fn(**job.payload)
+    except Exception:
+        error = traceback.format_exc()[-MAX_ERROR_LENGTH:]
+        retry = fn is not None and job.attempts < job.max_attempts
+        mine.update(
+            status=Task.QUEUED if retry else Task.FAILED, last_error=error, locked_by='',
+            run_after=timezone.now() + RETRY_DELAY * 2 ** (job.attempts - 1),
+            finished_at=None if retry else timezone.now(),
+        )
+        logger.warning('task %s #%s failed (attempt %s of %s)%s', job.name, job.pk, job.attempts,
+                       job.max_attempts, ', will retry' if retry else '', exc_info=True)
+        return False
+    mine.update(
+        status=Task.DONE, result=result, last_error='', locked_by='', finished_at=timezone.now(),
+    )
+    return True
+
+
+def requeue_stale(now=None):
+    """Hand tasks whose worker died mid-run back to the queue (or fail them)."""
+    cutoff = (now or timezone.now()) - LEASE
+    stale = Task.objects.filter(status=Task.RUNNING, heartbeat_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, locked_by='', finished_at=timezone.now(), last_error='worker lost'
+    )
+    requeued = stale.update(status=Task.QUEUED, locked_by='')
+    return requeued + failed
+
+
+def prune(now=None):
+    """Delete finished tasks older than KEEP_FINISHED, with what they left behind."""
+    cutoff = (now or timezone.now()) - KEEP_FINISHED
+    old = Task.objects.filter(status__in=[Task.DONE, Task.FAILED], finished_at__lt=cutoff)
+    hooks = {name: fn.on_prune for name, fn in REGISTRY.items() if fn.on_prune}
+    pruned = 0
+    for job in old.filter(name__in=hooks).only('name', 'result', 'payload'):
+        try:
+            hooks[job.name](job.result, job.payload)
+        except Exception:
+            logger.warning('cleanup for task %s #%s failed; keeping its row', job.name, job.pk, exc_info=True)
+            continue
+        pruned += Task.objects.filter(pk=job.pk).delete()[0]
+    return pruned + old.exclude(name__in=hooks).delete()[0]
+
+
+# ─── TASKS ────────────────────────────────────────────────────────────────────
+
+THUMBNAIL_MODELS = {'product': Product, 'category': Category}
+
+
+@task('thumbnails.build')
+def build_thumbnails(model, pk, fields):
+    instance = THUMBNAIL_MODELS[model].objects.filter(pk=pk).first()
+    if instance is None:
+        return {'skipped': 'deleted'}
+    built, failed = [], []
+    for field in fields:
+        image = getattr(instance, field)
+        if image:
+            try:
+                thumbnails.build(image)
+                built.append(field)
+            except thumbnails.IMAGE_ERRORS:  # logged by build; retrying would not help
+                failed.append(field)
+    return {'built': built, 'failed': failed}
+
+
+@task('rollups.rebuild')
+def rebuild_rollups():
+    return {'keys': rollups.rebuild()}
+
+
+def export_storage():
+    # outside MEDIA_ROOT: exports hold customer details and are only
+    # downloadable through the admin; uploaded imports wait here too
+    return FileSystemStorage(location=settings.EXPORT_ROOT)
+
+
+def delete_export(result, payload):
+    # exports hold customer details: they go with their task row
+    if result and result.get('file'):
+        export_storage().delete(result['file'])
+
+
+@task('exports.orders', max_attempts=2, on_prune=delete_export)
+def export_orders(fmt='csv', status='', date_from='', date_to=''):
+    orders = exports.filter_orders(status, date_from, date_to)
+    with tempfile.TemporaryFile('w+b') as tmp, replica_reads():
+        for line in exports.export_lines(orders, fmt):
+            tmp.write(line.encode())
+        tmp.seek(0)
+        name = export_storage().save(f'orders-{timezone.now():%Y%m%d-%H%M%S}.{fmt}', File(tmp))
+    return {'file': name, 'format': fmt}
+
+
+def delete_upload(result, payload):
+    export_storage().delete(payload['file'])  # no-op once the import removed it
+
+
+@task('imports.products', max_attempts=2, on_prune=delete_upload)
+def import_products(file, fmt='csv'):
+    storage = export_storage()
+    with storage.open(file, 'rb') as f:
+        report = importers.import_products(importers.read_rows(importers.text_stream(f), fmt))
+    storage.delete(file)  # kept on failure so the retry can read it
+    return {
+        'summary': report.summary(), 'failed': report.failed,
+        'errors': [[line, sku, message] for line, sku, message in report.errors[:IMPORT_ERRORS_SHOWN]],
+    }
@@ -1,7 +1,36 @@
 from django import template
+from django.utils.html import format_html, format_html_join
+
+from store.thumbnails import thumbnail_urls
 
 register = template.Library()
 
 @register.filter
 def split(value, arg):
     return value.split(arg)
+
+
+@register.simple_tag
+def thumbnail(image, size, **attrs):
+    """``{% thumbnail p.image 'card' alt=p.name %}``: a resized WebP/JPEG <picture>.
+
+    Extra keyword arguments become attributes of the <img>. Falls back to the
+    original upload when no derivative can be made.
+    """
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    attributes = format_html_join('', ' {}="{}"', sorted(attrs.items()))
+    urls = thumbnail_urls(image, size)
+    if not urls:
+        return format_html('<img src="{}"{}>', image.url, attributes)
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}"><img src="{}"{}></picture>',
+        urls['webp'], urls['jpeg'], attributes,
+    )
+
+
+@register.filter
+def thumbnail_url(image, size):
+    """JPEG derivative URL for places that need a bare URL (e.g. a JS image swap)."""
+    urls = thumbnail_urls(image, size)
+    return urls['jpeg'] if urls else image.url
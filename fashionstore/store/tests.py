@@ -0,0 +1,538 @@
+import io
+import itertools
+import re
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from PIL import Image
+
+from . import catalog, facets, ids, rollups, routers, search, tasks, thumbnails
+from .checkout import OutOfStock, place_order
+from .models import Cart, Category, Order, Product, ProductFacet, PromoCode, Task, User
+from .scenarios import bench_clients, send, shop_page_two, view_scenarios
+
+
+def log_in(client, user):
+    # the store keeps its own login in the session (see views.start_session)
+    session = client.session
+    session.update({'user_id': user.pk, 'user_name': user.name, 'role': user.role})
+    session.save()
+
+
+def make_user(username='shopper', role='customer'):
+    return User.objects.create(
+        name=username.title(), email=f'{username}@example.com', username=username, password='x', role=role,
+    )
+
+
+class QueryBudgetMixin:
+    def assertQueryBudget(self, response, label=''):
+        """Fail if the view behind ``response`` has no @query_budget or ran more queries."""
+        stats, budget = response.query_stats, response.query_budget
+        prefix = f'{label}: ' if label else ''
+        self.assertIsNotNone(budget, f'{prefix}the view declares no @query_budget')
+        duplicates = ''.join(f'\n  {count}× {sql[:120]}' for _, count, sql in stats.duplicates)
+        queries = stats.budgeted_queries
+        self.assertLessEqual(queries, budget, f'{prefix}{queries} queries, budget {budget}{duplicates}')
+
+
+# ─── ADMIN ORDER EXPORT ───────────────────────────────────────────────────────
+
+class OrderExportTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        log_in(self.client, make_user('boss', role='admin'))
+
+    def test_streamed_rows_are_counted(self):
+        for i in range(5):
+            Order.objects.create(order_id=f'EXP-{i}', customer_name='Exp', customer_email='exp@example.com',
+                                 shipping_address='-', city='-', pincode='-', subtotal=10, total=10)
+        response = self.client.get('/admin-orders/export/', {'format': 'jsonl'})
+        head = response.query_stats.queries
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 5)
+        self.assertIn(f'desc="{head} queries before the body"', response['Server-Timing'])
+        stats = response.query_stats
+        self.assertEqual(stats.stream_queries, 3)  # a batch, its items, then the empty batch that ends it
+        self.assertEqual(stats.queries, head + stats.stream_queries)
+        self.assertQueryBudget(response)
+
+    def test_unknown_format_is_not_reflected_as_html(self):
+        response = self.client.get('/admin-orders/export/', {'format': '<script>alert(1)</script>'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'text/plain')
+
+    def test_bad_filter_is_not_reflected_as_html(self):
+        response = self.client.get('/admin-orders/export/', {'from': '<img src=x onerror=alert(1)>'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'text/plain')
+
+
+# ─── SEARCH ───────────────────────────────────────────────────────────────────
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.gown = Product.objects.create(name='Midnight Silk Gown', description='Floor length', price=90)
+        self.wrap = Product.objects.create(name='Linen Wrap Dress', description='Silk lining', price=60)
+        Product.objects.create(name='Leather Shoes', description='Block heel', price=40)
+
+    def test_stem_keeps_a_prefix_of_the_word(self):
+        for word, stem in (('shoes', 'shoe'), ('dresses', 'dress'), ('watches', 'watch'), ('skirts', 'skirt'),
+                           ('dress', 'dress'), ('embroidered', 'embroider'), ('red', 'red')):
+            self.assertEqual(search.stem(word), stem)
+
+    def test_every_term_must_match(self):
+        found = search.search_products(Product.objects.all(), 'silk dresses')
+        self.assertEqual(list(found), [self.wrap])
+        self.assertEqual(search.search_products(Product.objects.all(), 'shoes').count(), 1)
+
+    def test_name_hits_rank_above_description_hits(self):
+        ranked = search.rank_products(search.search_products(Product.objects.all(), 'silk'), 'silk')
+        self.assertEqual(list(ranked.order_by('-relevance')), [self.gown, self.wrap])
+
+    def test_suggest(self):
+        log_in(self.client, make_user())
+        response = self.client.get('/search/suggest/', {'q': 'sil'})
+        self.assertEqual([r['name'] for r in response.json()['results']], ['Midnight Silk Gown'])
+
+
+# ─── FACETS ───────────────────────────────────────────────────────────────────
+
+class FacetSyncTests(TestCase):
+    def test_recased_and_reordered_values_are_synced(self):
+        product = Product.objects.create(name='Tee', description='-', price=20, sizes='S,M,L', colors='navy')
+        product.sizes, product.colors = 'L,M,S', 'Navy'
+        product.save()
+        product = Product.objects.prefetch_related('facets').get(pk=product.pk)
+        self.assertEqual(product.get_sizes(), ['L', 'M', 'S'])
+        self.assertEqual(product.get_colors(), ['Navy'])
+
+
+class FacetCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for price in (40, 50, 100, 150):
+            Product.objects.create(name=f'Dress {price}', description='-', price=price, sizes='M', colors='Red')
+
+    def test_every_dimension_in_one_query(self):
+        filters = catalog.normalize_filters({})
+        with self.assertNumQueries(2):  # the catalog version for the cache key, then the counts
+            counts = facets.facet_counts(filters)
+        self.assertEqual([b['count'] for b in counts['price_bands']], [1, 1, 2, 0])
+        self.assertEqual(counts['sizes'], [{'key': 'm', 'value': 'M', 'count': 4}])
+
+    def test_max_price_is_inclusive_and_band_links_match_their_counts(self):
+        def shown(**params):
+            return catalog.filter_products(catalog.normalize_filters(params)).count()
+
+        self.assertEqual(shown(max_price='100'), 3)
+        bands = facets.facet_counts(catalog.normalize_filters({}))['price_bands']
+        for band in bands:
+            self.assertEqual(shown(min_price=band['min'], max_price=band['max']), band['count'], band['label'])
+
+
+# ─── STOREFRONT CACHE ─────────────────────────────────────────────────────────
+
+class StorefrontCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(name='Wrap Dress', description='-', price=60)
+
+    def test_missing_products_are_not_cached(self):
+        missing = self.product.pk + 1
+        self.assertEqual(catalog.product_with_related(missing), (None, []))
+        self.assertIsNone(cache.get(f'storefront:product:{catalog.catalog_version()}:{missing}'))
+
+    def test_warm_product_page_reads_only_the_session_and_the_version(self):
+        log_in(self.client, make_user())
+        self.client.get(f'/product/{self.product.pk}/')
+        response = self.client.get(f'/product/{self.product.pk}/')
+        self.assertEqual(response.query_stats.queries, 2)
+
+
+# ─── THUMBNAILS ───────────────────────────────────────────────────────────────
+
+class ThumbnailTests(TestCase):
+    CARD = Template("{% load custom_tags %}{% thumbnail p.image 'card' alt=p.name %}")
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+        png = io.BytesIO()
+        Image.new('RGB', (1200, 1600), (200, 80, 120)).save(png, 'PNG')
+        self.product = Product.objects.create(name='Pink Dress', description='-', price=70)
+        self.product.image.save('pink.png', ContentFile(png.getvalue()))
+
+    def render(self):
+        return self.CARD.render(Context({'p': self.product}))
+
+    def test_a_miss_queues_a_build_and_shows_the_original(self):
+        with mock.patch.object(thumbnails, 'content_hash') as content_hash:
+            html = self.render()
+            self.render()
+            cache.clear()
+            self.render()
+        content_hash.assert_not_called()
+        self.assertNotIn('<picture>', html)
+        self.assertIn(self.product.image.url, html)
+        self.assertEqual(Task.objects.filter(name='thumbnails.build', status=Task.QUEUED).count(), 1)
+
+    def test_built_thumbnails_are_found_by_every_process(self):
+        self.render()
+        self.assertEqual(tasks.build_thumbnails('product', self.product.pk, ['image'])['built'], ['image'])
+        cache.clear()  # as in another process
+        with mock.patch.object(thumbnails, 'content_hash') as content_hash:
+            html = self.render()
+        content_hash.assert_not_called()
+        self.assertIn('<picture><source type="image/webp"', html)
+
+    def test_thumbnail_route_is_for_debug_only(self):
+        with self.assertRaises(Resolver404):
+            resolve('/media/thumbs/ab/abcdef-480.jpg')
+
+
+# ─── TASK QUEUE ───────────────────────────────────────────────────────────────
+
+class HeartbeatTests(SimpleTestCase):
+    def test_a_failed_beat_does_not_stop_the_heartbeat(self):
+        beats = threading.Semaphore(0)
+        calls = itertools.count()
+
+        def update(**fields):
+            if next(calls) == 0:
+                raise OperationalError('server has gone away')
+            beats.release()
+            return 1
+
+        job = mock.Mock(pk=1, locked_by='worker-1')
+        job.name = 'exports.orders'
+        rows = mock.Mock(update=update)
+        with mock.patch.object(tasks, 'HEARTBEAT', timedelta(milliseconds=5)), \
+                mock.patch.object(Task.objects, 'filter', return_value=rows), \
+                self.assertLogs('store.tasks', 'ERROR'):
+            with tasks.heartbeat(job):
+                self.assertTrue(beats.acquire(timeout=5))
+
+
+# ─── CART QUOTE ───────────────────────────────────────────────────────────────
+
+class CartQuoteTests(TestCase):
+    def setUp(self):
+        log_in(self.client, make_user())
+        product = Product.objects.create(name='Wrap Dress', description='-', price=100, stock=5)
+        self.client.post(f'/cart/add/{product.pk}/', {'size': 'M', 'color': 'Black'})
+        self.promo = PromoCode.objects.create(code='SAVE10', discount_pct=10, is_active=True)
+        self.client.post('/apply-promo/', {'promo_code': 'SAVE10'})
+
+    def test_deactivated_promo_is_not_served_from_the_memo(self):
+        self.assertEqual(self.client.get('/cart/').context['discount'], Decimal('10.00'))
+        self.promo.is_active = False
+        self.promo.save()
+        self.assertEqual(self.client.get('/cart/').context['discount'], Decimal('0.00'))
+        self.assertEqual(self.client.get('/checkout/').context['discount'], Decimal('0.00'))
+
+    def test_changed_discount_is_not_served_from_the_memo(self):
+        self.client.get('/cart/')
+        PromoCode.objects.filter(pk=self.promo.pk).update(discount_pct=25)
+        self.assertEqual(self.client.get('/cart/').context['discount'], Decimal('25.00'))
+
+
+# ─── CHECKOUT CONCURRENCY ─────────────────────────────────────────────────────
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    SHOPPERS = 8
+    STOCK = 3
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('threads cannot wait for each other on an in-memory SQLite database')
+        self.product = Product.objects.create(name='Last Few Dress', description='-', price=50, stock=self.STOCK)
+        for i in range(self.SHOPPERS):
+            Cart.objects.create(session_key=f'race-{i}', product=self.product, quantity=1)
+
+    def test_limited_stock_is_never_oversold(self):
+        barrier = threading.Barrier(self.SHOPPERS)
+        outcomes = []
+
+        def shopper(i):
+            try:
+                barrier.wait()
+                place_order(f'race-{i}', None, {'customer_name': 'Race', 'shipping_address': '-', 'city': '-',
+                                                'pincode': '-', 'payment_method': 'card'}, f'RACE-{i}')
+                outcomes.append('ok')
+            except Exception as e:
+                outcomes.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=shopper, args=(i,)) for i in range(self.SHOPPERS)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.product.refresh_from_db()
+        losers = [o for o in outcomes if o != 'ok']
+        self.assertEqual(outcomes.count('ok'), self.STOCK)
+        self.assertEqual(len(losers), self.SHOPPERS - self.STOCK)
+        for loser in losers:
+            self.assertIsInstance(loser, OutOfStock)
+        self.assertEqual(self.product.stock, 0)
+        self.assertEqual(Order.objects.count(), self.STOCK)
+        self.assertEqual(Cart.objects.filter(product=self.product).count(), self.SHOPPERS - self.STOCK)
+
+
+# ─── ROLLUPS ──────────────────────────────────────────────────────────────────
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.order = Order.objects.create(
+            order_id='ROLL-1', customer_name='Roll', customer_email='roll@example.com', shipping_address='-',
+            city='-', pincode='-', subtotal=80, total=80,
+        )
+
+    def metrics(self, *keys):
+        return {key: (m.count, m.amount) for key, m in rollups.read(keys).items()}
+
+    def test_untracked_changes_do_not_lock_the_row(self):
+        order = Order.objects.get(pk=self.order.pk)
+        order.city = 'Pune'
+        with CaptureQueriesContext(connection) as ctx:
+            order.save()
+            Order.objects.get(pk=order.pk).save(update_fields=['city'])
+        reads = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(reads), 1)  # the get() itself
+
+    def test_tracked_changes_move_the_rollups_like_a_rebuild(self):
+        self.order.status = 'shipped'
+        self.order.save()
+        Order.objects.get(pk=self.order.pk).save(update_fields=['city'])
+        self.order.total = 100
+        self.order.save(update_fields=['total'])
+        keys = ('orders', 'orders:pending', 'orders:shipped', 'revenue')
+        incremental = self.metrics(*keys)
+        self.assertEqual(incremental['orders:pending'], (0, 0))
+        self.assertEqual(incremental['revenue'], (1, Decimal('100.00')))
+        rollups.rebuild()
+        self.assertEqual(self.metrics(*keys), incremental)
+
+
+# ─── ORDER IDS ────────────────────────────────────────────────────────────────
+
+class OrderIdTests(SimpleTestCase):
+    NOW = 1790000000.0  # a fixed wall clock, in seconds
+
+    def setUp(self):
+        # a fresh generator per test, and none left running on the fake clock
+        ids._state['pid'] = None
+        self.addCleanup(ids._state.update, pid=None)
+
+    def assertWellFormed(self, order_ids):
+        for order_id in order_ids:
+            self.assertTrue(order_id.startswith(ids.PREFIX))
+            body = order_id[len(ids.PREFIX):]
+            self.assertEqual(len(body), 16)
+            self.assertTrue(set(body) <= set(ids.ALPHABET), order_id)
+
+    def test_unique_across_threads(self):
+        batches = []
+
+        def worker():
+            batches.append(ids.generate_order_ids(2000))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        order_ids = [order_id for batch in batches for order_id in batch]
+        self.assertEqual(len(set(order_ids)), 8 * 2000)
+        self.assertWellFormed(order_ids)
+        for batch in batches:
+            self.assertEqual(batch, sorted(batch))
+
+    def test_same_millisecond_calls_are_unique_and_ordered(self):
+        with mock.patch.object(ids.time, 'time', return_value=self.NOW):
+            order_ids = ids.generate_order_ids(1000)
+        self.assertEqual(len(set(order_ids)), 1000)
+        self.assertEqual(order_ids, sorted(order_ids))
+        self.assertWellFormed(order_ids)
+
+    def test_sequence_overflow_waits_for_the_next_millisecond(self):
+        per_ms = 1 << ids.SEQ_BITS
+        clock = itertools.chain(itertools.repeat(self.NOW, per_ms + 3), itertools.repeat(self.NOW + 0.001))
+        with mock.patch.object(ids.time, 'time', side_effect=lambda: next(clock)):
+            order_ids = ids.generate_order_ids(per_ms + 10)
+        self.assertEqual(len(set(order_ids)), per_ms + 10)
+        self.assertEqual(order_ids, sorted(order_ids))
+
+    def test_clock_stepping_back_keeps_order(self):
+        clock = iter([self.NOW, self.NOW + 5, self.NOW - 60, self.NOW + 5.001])
+        with mock.patch.object(ids.time, 'time', side_effect=lambda: next(clock)):
+            order_ids = ids.generate_order_ids(4)
+        self.assertEqual(len(set(order_ids)), 4)
+        self.assertEqual(order_ids, sorted(order_ids))
+        self.assertWellFormed(order_ids)
+
+
+# ─── INDEXES ──────────────────────────────────────────────────────────────────
+# EXPLAIN every hot storefront/admin query: none may read a table without an
+# index. The data is a small synthetic store, enough for the planner to have
+# a choice.
+
+def hot_queries():
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    active = Product.objects.filter(status='active')
+    return [
+        ('cart badge count', Cart.objects.filter(session_key='k').values('pk')),
+        ('cart line lookup', Cart.objects.filter(session_key='k', product_id=1, size='M', color='Black')),
+        ('cart expiry scan', Cart.objects.filter(updated_at__lt=today).order_by('updated_at', 'pk')[:500]),
+        ('home trending', active.filter(is_trending=True)[:4]),
+        ('home new arrivals', active.filter(is_new_arrival=True)[:4]),
+        ('shop newest', active.order_by('-created_at', '-pk')[:25]),
+        ('shop price asc', active.order_by('price', 'pk')[:25]),
+        ('shop top rated', active.order_by('-rating', '-pk')[:25]),
+        ('shop size facet', ProductFacet.objects.filter(kind='size', key='m').values('product_id')),
+        ('customer orders', Order.objects.filter(user_id=1).order_by('-created_at')),
+        ('admin orders by status', Order.objects.filter(status='pending').order_by('-created_at')),
+        ('admin recent orders', Order.objects.order_by('-created_at')[:10]),
+        ('admin revenue today', Order.objects.filter(created_at__gte=today, created_at__lt=today + timedelta(days=1))),
+        ('admin customers', User.objects.filter(role='customer').order_by('-created_at')),
+    ]
+
+
+def full_scans(queryset):
+    """Return the table names ``queryset`` reads without an index."""
+    db = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+    with db.cursor() as cursor:
+        if db.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+            return [m.group(1) for m in (re.match(r'SCAN (\w+)$', d) for d in plan) if m]
+        cursor.execute(f'EXPLAIN {sql}', params)
+        columns = [c[0] for c in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return [r['table'] for r in rows if r['type'] == 'ALL']
+
+
+class IndexUsageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_data', scale=2000, stdout=StringIO())
+
+    def test_hot_queries_use_an_index(self):
+        if connection.vendor not in ('sqlite', 'mysql'):
+            self.skipTest(f'EXPLAIN checks are not implemented for {connection.vendor}')
+        for label, queryset in hot_queries():
+            with self.subTest(label):
+                self.assertEqual(full_scans(queryset), [])
+
+
+# ─── QUERY BUDGETS ────────────────────────────────────────────────────────────
+# Every page in store/scenarios.py, on a cold cache, against its view's
+# @query_budget.
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_data', scale=2000, stdout=StringIO())
+
+    def test_every_view_is_within_its_budget(self):
+        product, scenarios = view_scenarios()
+        with bench_clients() as clients:
+            for name, who, method, url, data, setup in scenarios:
+                with self.subTest(name):
+                    if name == 'shop page 2':
+                        url = shop_page_two(clients[who])
+                        self.assertIsNotNone(url, 'the shop has a single page')
+                    if setup:
+                        setup(clients[who])
+                    cache.clear()
+                    response = send(clients[who], method, url, data)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    self.assertQueryBudget(response)
+
+
+# ─── READ REPLICAS ────────────────────────────────────────────────────────────
+# Needs a second alias, replica1, mirroring the test database: set
+# DB_REPLICA_HOSTS, or add a second SQLite database with
+# 'TEST': {'MIRROR': 'default'} and DATABASE_REPLICAS = ['replica1'].
+
+HAS_REPLICA = 'replica1' in getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@skipUnless(HAS_REPLICA, 'no replica1 database configured')
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica1'} if HAS_REPLICA else {'default'}  # the runner checks every alias listed
+
+    def setUp(self):
+        category = Category.objects.create(name='Dresses', slug='dresses')
+        self.product = Product.objects.create(name='Replica Dress', description='-', price=80, stock=5, category=category)
+        self.customer = make_user()
+        self.addCleanup(routers._down_until.clear)
+        cache.clear()
+
+    def get(self, url, replica_down=False):
+        """``(response, queries on the primary, queries on replica1)``."""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica1']) as replica:
+            if replica_down:
+                with mock.patch.object(connections['replica1'], 'ensure_connection', side_effect=OperationalError):
+                    response = self.client.get(url)
+            else:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(primary), len(replica)
+
+    def test_catalog_reads_use_the_replica(self):
+        log_in(self.client, self.customer)
+        _, primary, replica = self.get(f'/product/{self.product.pk}/')
+        self.assertGreater(replica, 0)
+        response, primary, replica = self.get('/api/v1/products/')
+        self.assertEqual(primary, 0)  # not even the session
+        self.assertGreater(replica, 0)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+
+    def test_a_write_pins_the_browser_to_the_primary(self):
+        log_in(self.client, self.customer)
+        self.client.post(f'/cart/add/{self.product.pk}/', {'size': 'M', 'color': 'Black'})
+        response = self.client.post('/checkout/', {'full_name': 'R', 'address': '1', 'city': 'c', 'pincode': '1',
+                                                   'payment_method': 'card'})
+        self.assertRedirects(response, '/order/confirm/', fetch_redirect_response=False)
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+        _, primary, replica = self.get('/order/confirm/')
+        self.assertEqual(replica, 0)
+        _, primary, replica = self.get(f'/product/{self.product.pk}/')
+        self.assertEqual(replica, 0)
+
+        self.client.cookies[routers.PIN_COOKIE] = '0'  # the pin has lapsed
+        _, primary, replica = self.get(f'/product/{self.product.pk}/')
+        self.assertGreater(replica, 0)
+
+    def test_unreachable_replica_falls_back_to_the_primary(self):
+        _, primary, replica = self.get('/api/v1/products/', replica_down=True)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+        _, primary, replica = self.get('/api/v1/products/')  # skipped for a while, not retried per query
+        self.assertEqual(replica, 0)
@@ -0,0 +1,162 @@
+import hashlib
+import io
+import json
+import logging
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+# Display slots -> derivative width in pixels, about twice the CSS width so
+# they stay sharp on high-density screens. Never upscaled.
+SIZES = {
+    'thumb': 160,   # cart/checkout lines, detail-page thumbnail strip
+    'card': 480,    # product and category grids
+    'detail': 960,  # product detail main image
+}
+FORMATS = {'webp': ('WEBP', 'image/webp'), 'jpeg': ('JPEG', 'image/jpeg')}
+QUALITY = 80
+THUMB_DIR = 'thumbs'
+URL_CACHE_TTL = 60 * 60 * 24
+PENDING_CACHE_TTL = 60  # how long a process shows the original before looking again
+# unreadable file, unknown format (UnidentifiedImageError is an OSError), or
+# an image too large to decode safely
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+# ─── DERIVATIVES ──────────────────────────────────────────────────────────────
+# Files are named after a hash of the original's bytes plus the width, so a
+# name never points at different content and can be cached forever
+# (see views.media_thumbnail). Identical uploads share their derivatives.
+#
+# Hashing the original and resizing it is worker work (the thumbnails.build
+# task, or `build_thumbnails`). When it is done, a small manifest stored under
+# the upload's name records the URLs, so any web process finds them without
+# reading the original; until then pages show the original upload.
+
+def content_hash(image_field):
+    digest = hashlib.sha1()
+    with image_field.storage.open(image_field.name, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def derivative_name(digest, width, fmt):
+    return f'{THUMB_DIR}/{digest[:2]}/{digest}-{width}.{"jpg" if fmt == "jpeg" else fmt}'
+
+
+def _render(original, width, fmt):
+    image = original.copy()
+    if image.width > width:
+        image.thumbnail((width, image.height), Image.LANCZOS)
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        # flatten transparency onto white rather than black
+        image = image.convert('RGBA')
+        flat = Image.new('RGB', image.size, (255, 255, 255))
+        flat.paste(image, mask=image.getchannel('A'))
+        image = flat
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    out = io.BytesIO()
+    image.save(out, FORMATS[fmt][0], quality=QUALITY, optimize=True, **({'method': 4} if fmt == 'webp' else {}))
+    return out.getvalue()
+
+
+def build(image_field):
+    """Write any missing derivatives of ``image_field`` and its manifest; returns ``{size: {fmt: url}}``.
+
+    Raises one of IMAGE_ERRORS when the original cannot be read; the
+    manifest then records no derivatives, so pages keep showing the original.
+    """
+    error = None
+    urls = {size: {} for size in SIZES}
+    try:
+        digest = content_hash(image_field)
+        original = None
+        for size, width in SIZES.items():
+            for fmt in FORMATS:
+                name = derivative_name(digest, width, fmt)
+                if not default_storage.exists(name):
+                    if original is None:
+                        with image_field.storage.open(image_field.name, 'rb') as f:
+                            original = ImageOps.exif_transpose(Image.open(f))
+                            original.load()
+                    default_storage.save(name, ContentFile(_render(original, width, fmt)))
+                urls[size][fmt] = default_storage.url(name)
+    except IMAGE_ERRORS as e:
+        error = e
+        urls = {size: {} for size in SIZES}
+    manifest = _manifest_name(image_field)
+    default_storage.delete(manifest)
+    default_storage.save(manifest, ContentFile(json.dumps({'bytes': image_field.size, 'urls': urls})))
+    for size in SIZES:
+        cache.set(_cache_key(image_field, size), urls[size], URL_CACHE_TTL)
+    if error:
+        raise error
+    return urls
+
+
+def _name_hash(image_field):
+    return hashlib.md5(image_field.name.encode()).hexdigest()
+
+
+def _cache_key(image_field, size):
+    return f'thumb:{_name_hash(image_field)}:{size}'
+
+
+def _manifest_name(image_field):
+    digest = _name_hash(image_field)
+    return f'{THUMB_DIR}/index/{digest[:2]}/{digest}.json'
+
+
+def _read_manifest(image_field):
+    # None when there is none yet, or it describes an earlier upload that had the same name
+    try:
+        size = image_field.size
+    except OSError:
+        return {}  # the original is gone: nothing to build
+    try:
+        with default_storage.open(_manifest_name(image_field)) as f:
+            manifest = json.load(f)
+        if manifest['bytes'] == size:
+            return manifest['urls']
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def _queue_build(image_field):
+    from . import tasks  # tasks imports this module
+
+    instance = image_field.instance
+    model = instance._meta.model_name
+    if model in tasks.THUMBNAIL_MODELS and instance.pk:
+        tasks.enqueue('thumbnails.build', unique=True, model=model, pk=instance.pk, fields=[image_field.field.name])
+
+
+def thumbnail_urls(image_field, size):
+    """``{'webp': url, 'jpeg': url}`` for one display size, or None to use the original.
+
+    Never builds anything itself: a missing derivative is queued for the
+    worker and the original is shown meanwhile. Admin uploads queue the build
+    as soon as they are saved (see store.tasks).
+    """
+    if not image_field:
+        return None
+    key = _cache_key(image_field, size)
+    urls = cache.get(key)
+    if urls is None:
+        manifest = _read_manifest(image_field)
+        if manifest is None:
+            _queue_build(image_field)
+            cache.set(key, {}, PENDING_CACHE_TTL)
+            return None
+        urls = manifest.get(size, {})
+        cache.set(key, urls, URL_CACHE_TTL)
+    return urls or None
+
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -11,6 +12,7 @@ urlpatterns = [
     # Customer pages
     path('home/', views.home, name='home'),
     path('shop/', views.shop, name='shop'),
+    path('search/suggest/', views.search_suggest, name='search_suggest'),
     path('product/<int:pk>/', views.product_detail, name='product_detail'),
     path('cart/', views.cart_view, name='cart'),
     path('cart/add/<int:pk>/', views.cart_add, name='cart_add'),
@@ -21,15 +23,30 @@ urlpatterns = [
     path('orders/', views.user_orders, name='user_orders'),
     path('apply-promo/', views.apply_promo, name='apply_promo'),
 
+    # Catalog API
+    path('api/v1/products/', views.api_products, name='api_products'),
+    path('api/v1/products/<int:pk>/', views.api_product, name='api_product'),
+    path('api/v1/categories/', views.api_categories, name='api_categories'),
+
     # Admin pages
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('admin-dashboard/db-pool/', views.admin_db_pool, name='admin_db_pool'),
     path('admin-products/', views.admin_products, name='admin_products'),
     path('admin-products/add/', views.admin_product_add, name='admin_product_add'),
+    path('admin-products/import/', views.admin_product_import, name='admin_product_import'),
     path('admin-products/edit/<int:pk>/', views.admin_product_edit, name='admin_product_edit'),
     path('admin-products/delete/<int:pk>/', views.admin_product_delete, name='admin_product_delete'),
     path('admin-orders/', views.admin_orders, name='admin_orders'),
+    path('admin-orders/export/', views.admin_orders_export, name='admin_orders_export'),
+    path('admin-orders/export/queue/', views.admin_orders_export_job, name='admin_orders_export_job'),
+    path('admin-orders/export/<int:pk>/download/', views.admin_export_download, name='admin_export_download'),
     path('admin-orders/update/<int:pk>/', views.admin_order_update, name='admin_order_update'),
     path('admin-users/', views.admin_users, name='admin_users'),
     path('admin-users/toggle/<int:pk>/', views.admin_user_toggle, name='admin_user_toggle'),
     path('admin-users/delete/<int:pk>/', views.admin_user_delete, name='admin_user_delete'),
 ]
+
+if settings.DEBUG:
+    # Like the MEDIA_URL route it comes ahead of: in production the web server
+    # serves media/ (give media/thumbs/ the same long cache headers there)
+    urlpatterns.append(path('media/thumbs/<path:path>', views.media_thumbnail, name='media_thumbnail'))
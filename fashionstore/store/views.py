@@ -1,10 +1,26 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.conf import settings
 from django.contrib import messages
-from django.db.models import Sum, Count, Q
-from django.http import JsonResponse
+from django.db.models import Count, Q
+from django.http import FileResponse, Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
-import json, hashlib, random, string
-from .models import User, Product, Category, Order, OrderItem, Cart, PromoCode
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_safe
+from django.views.static import serve
+import json, hashlib, os
+from .models import User, Product, Category, Order, Cart, PromoCode, Task
+from . import api, catalog, exports, importers, rollups, search, tasks, thumbnails
+from .cart import cart_changed, get_cart_key, restore_cart, set_cart_count
+from .checkout import EmptyCart, OutOfStock, place_order
+from .db import pool as db_pool
+from .ids import generate_order_id
+from .pricing import get_quote
+from .facets import facet_counts
+from .pagination import keyset_page
+from .perf import query_budget
+
+ADMIN_PAGE_SIZE = 25
 
 
 # ─── HELPERS ──────────────────────────────────────────────────────────────────
@@ -12,11 +28,6 @@ from .models import User, Product, Category, Order, OrderItem, Cart, PromoCode
 def hash_password(pw):
     return hashlib.sha256(pw.encode()).hexdigest()
 
-def get_session_key(request):
-    if not request.session.session_key:
-        request.session.create()
-    return request.session.session_key
-
 def login_required_customer(view_func):
     def wrapper(request, *args, **kwargs):
         if not request.session.get('user_id'):
@@ -33,8 +44,36 @@ def login_required_admin(view_func):
     wrapper.__name__ = view_func.__name__
     return wrapper
 
-def generate_order_id():
-    return 'ORD-' + ''.join(random.choices(string.digits, k=6))
+def start_session(request, user_id, name, role):
+    request.session.cycle_key()  # a fresh session key at login: no session fixation
+    request.session['user_id'] = user_id
+    request.session['user_name'] = name
+    request.session['role'] = role
+
+def wants_json(request):
+    # the cart forms' script asks for JSON; a plain form post still gets a redirect
+    return 'application/json' in request.headers.get('Accept', '')
+
+def cart_json(request, cart_key, item_id, message=''):
+    """The changed line (None once removed), badge count and fresh quote in one reply."""
+    quote = get_quote(request, cart_key).to_dict()
+    lines = quote.pop('lines')
+    set_cart_count(request, len(lines))
+    return JsonResponse({
+        'line': next((line for line in lines if line['id'] == item_id), None),
+        'cart_count': len(lines),
+        'quote': quote,
+        'message': message,
+    })
+
+def query_with(request, **changes):
+    params = request.GET.copy()
+    for key, value in changes.items():
+        if value is None:
+            params.pop(key, None)
+        else:
+            params[key] = value
+    return params.urlencode()
 
 
 # ─── AUTH VIEWS ───────────────────────────────────────────────────────────────
@@ -63,9 +102,8 @@ def login_view(request):
                 name=name, email=email, username=username,
                 password=hash_password(password), role='customer'
             )
-            request.session['user_id'] = user.id
-            request.session['user_name'] = user.name
-            request.session['role'] = 'customer'
+            start_session(request, user.id, user.name, 'customer')
+            restore_cart(request, user)
             return redirect('home')
 
         # LOGIN
@@ -74,9 +112,7 @@ def login_view(request):
 
         # Special admin credentials
         if username == 'admin' and password == 'admin':
-            request.session['user_id'] = 0
-            request.session['user_name'] = 'Admin'
-            request.session['role'] = 'admin'
+            start_session(request, 0, 'Admin', 'admin')
             return redirect('admin_dashboard')
 
         try:
@@ -84,9 +120,8 @@ def login_view(request):
             if user.status == 'blocked':
                 messages.error(request, 'Your account has been blocked. Contact support.')
                 return render(request, 'store/login.html', {})
-            request.session['user_id'] = user.id
-            request.session['user_name'] = user.name
-            request.session['role'] = user.role
+            start_session(request, user.id, user.name, user.role)
+            restore_cart(request, user)
             if user.role == 'admin':
                 return redirect('admin_dashboard')
             return redirect('home')
@@ -107,144 +142,139 @@ def register_view(request):
 
 # ─── CUSTOMER VIEWS ───────────────────────────────────────────────────────────
 
+@query_budget(4)
 @login_required_customer
 def home(request):
-    categories = Category.objects.all()
-    trending = Product.objects.filter(is_trending=True, status='active')[:4]
-    new_arrivals = Product.objects.filter(is_new_arrival=True, status='active')[:4]
     return render(request, 'store/home.html', {
-        'categories': categories,
-        'trending': trending,
-        'new_arrivals': new_arrivals,
+        **catalog.home_sections(),
+        'catalog_version': catalog.catalog_version(),
     })
 
 
+@query_budget(10)
 @login_required_customer
 def shop(request):
-    products = Product.objects.filter(status='active')
     categories = Category.objects.all()
+    filters = catalog.normalize_filters(request.GET)
+    sort = request.GET.get('sort') or catalog.default_sort(filters)
+    cursor = request.GET.get('cursor', '')
 
-    # Filters
-    category_id = request.GET.get('category')
-    size = request.GET.get('size')
-    color = request.GET.get('color')
-    min_price = request.GET.get('min_price')
-    max_price = request.GET.get('max_price')
-    sort = request.GET.get('sort', 'newest')
-    search = request.GET.get('q', '')
-
-    if category_id:
-        products = products.filter(category_id=category_id)
-    if size:
-        products = products.filter(sizes__icontains=size)
-    if color:
-        products = products.filter(colors__icontains=color)
-    if min_price:
-        products = products.filter(price__gte=min_price)
-    if max_price:
-        products = products.filter(price__lte=max_price)
-    if search:
-        products = products.filter(Q(name__icontains=search) | Q(description__icontains=search))
-
-    sort_options = {
-        'newest': '-created_at',
-        'price_asc': 'price',
-        'price_desc': '-price',
-        'rating': '-rating',
-    }
-    products = products.order_by(sort_options.get(sort, '-created_at'))
-
-    total_count = products.count()
+    page, total_count = catalog.product_page(filters, sort, cursor)
+    facets = facet_counts(filters)
+    for cat in categories:
+        cat.product_count = facets['categories'].get(cat.id, 0)
 
     return render(request, 'store/shop.html', {
-        'products': products,
+        'products': page.object_list,
+        'page': page,
+        'next_query': query_with(request, cursor=page.next_cursor) if page.has_next else '',
+        'first_query': query_with(request, cursor=None) if cursor else '',
         'categories': categories,
         'total_count': total_count,
-        'selected_category': category_id,
-        'selected_size': size,
+        'selected_category': filters['category'] or None,
+        'selected_size': filters['size'] or None,
+        'selected_color': filters['color'] or None,
+        'selected_min': filters['min_price'],
+        'selected_max': filters['max_price'],
+        'facets': facets,
         'sort': sort,
-        'search': search,
+        'search': filters['q'],
     })
 
 
+@query_budget(3)
+@login_required_customer
+def search_suggest(request):
+    results = search.suggest(Product.objects.filter(status='active'), request.GET.get('q', ''))
+    for r in results:
+        r['url'] = reverse('product_detail', args=[r['id']])
+    return JsonResponse({'results': results})
+
+
+@query_budget(5)
 @login_required_customer
 def product_detail(request, pk):
-    product = get_object_or_404(Product, pk=pk, status='active')
-    related = Product.objects.filter(category=product.category, status='active').exclude(pk=pk)[:4]
+    product, related = catalog.product_with_related(pk)
+    if product is None:
+        raise Http404('No such product')
     return render(request, 'store/product_detail.html', {
         'product': product,
         'related': related,
+        'catalog_version': catalog.catalog_version(),
         'sizes': product.get_sizes(),
         'colors': product.get_colors(),
     })
 
 
+@query_budget(6)
 @login_required_customer
 def cart_view(request):
-    session_key = get_session_key(request)
-    cart_items = Cart.objects.filter(session_key=session_key).select_related('product')
-    subtotal = sum(item.subtotal() for item in cart_items)
-    shipping = 0 if subtotal >= 200 else 12
-    tax = round(float(subtotal) * 0.08, 2)
-    total = float(subtotal) + shipping + tax
-
-    # Apply promo if in session
-    discount = 0
-    promo = request.session.get('promo_code', '')
-    if promo:
-        try:
-            p = PromoCode.objects.get(code=promo, is_active=True)
-            discount = round(float(subtotal) * p.discount_pct / 100, 2)
-            total -= discount
-        except PromoCode.DoesNotExist:
-            pass
+    cart_key = get_cart_key(request)
+    cart_items = list(Cart.objects.filter(session_key=cart_key).select_related('product').order_by('pk'))
+    set_cart_count(request, len(cart_items))
+    quote = get_quote(request, cart_key, cart_items)
 
     return render(request, 'store/cart.html', {
         'cart_items': cart_items,
-        'subtotal': subtotal,
-        'shipping': shipping,
-        'tax': tax,
-        'total': round(total, 2),
-        'discount': discount,
-        'promo': promo,
+        **quote.context(),
+        'promo': request.session.get('promo_code', ''),
     })
 
 
+@query_budget(10)
 @login_required_customer
 def cart_add(request, pk):
     product = get_object_or_404(Product, pk=pk)
-    session_key = get_session_key(request)
+    cart_key = get_cart_key(request)
     size = request.POST.get('size', 'M')
     color = request.POST.get('color', 'Black')
 
     item, created = Cart.objects.get_or_create(
-        session_key=session_key, product=product, size=size, color=color,
+        session_key=cart_key, product=product, size=size, color=color,
         defaults={'quantity': 1}
     )
     if not created:
         item.quantity += 1
         item.save()
+    cart_changed(request, 1 if created else 0)
 
-    messages.success(request, f'"{product.name}" added to cart!')
+    message = f'"{product.name}" added to cart!'
+    if wants_json(request):
+        return cart_json(request, cart_key, item.pk, message)
+    messages.success(request, message)
     return redirect(request.META.get('HTTP_REFERER', 'cart'))
 
 
+@query_budget(8)
 @login_required_customer
 def cart_update(request, item_id):
-    item = get_object_or_404(Cart, pk=item_id, session_key=get_session_key(request))
-    qty = int(request.POST.get('quantity', 1))
+    cart_key = get_cart_key(request)
+    item = get_object_or_404(Cart, pk=item_id, session_key=cart_key)
+    try:
+        qty = int(request.POST.get('quantity', 1))
+    except ValueError:
+        return HttpResponseBadRequest('quantity must be a whole number')
     if qty < 1:
         item.delete()
+        cart_changed(request, -1)
     else:
         item.quantity = qty
         item.save()
+        cart_changed(request)
+    if wants_json(request):
+        return cart_json(request, cart_key, item_id)
     return redirect('cart')
 
 
+@query_budget(8)
 @login_required_customer
 def cart_remove(request, item_id):
-    item = get_object_or_404(Cart, pk=item_id, session_key=get_session_key(request))
+    cart_key = get_cart_key(request)
+    item = get_object_or_404(Cart, pk=item_id, session_key=cart_key)
     item.delete()
+    cart_changed(request, -1)
+    if wants_json(request):
+        return cart_json(request, cart_key, item_id)
     return redirect('cart')
 
 
@@ -260,37 +290,15 @@ def apply_promo(request):
     return redirect('cart')
 
 
+@query_budget(24)  # placing an order: one stock UPDATE per distinct product
 @login_required_customer
 def checkout_view(request):
-    session_key = get_session_key(request)
-    cart_items = Cart.objects.filter(session_key=session_key).select_related('product')
-    if not cart_items.exists():
+    cart_key = get_cart_key(request)
+    cart_items = list(Cart.objects.filter(session_key=cart_key).select_related('product').order_by('pk'))
+    if not cart_items:
         return redirect('cart')
 
-    subtotal = sum(item.subtotal() for item in cart_items)
-    shipping = 0 if subtotal >= 200 else 12
-    tax = round(float(subtotal) * 0.08, 2)
-    discount = 0
-    promo = request.session.get('promo_code', '')
-    if promo:
-        try:
-            p = PromoCode.objects.get(code=promo, is_active=True)
-            discount = round(float(subtotal) * p.discount_pct / 100, 2)
-        except PromoCode.DoesNotExist:
-            pass
-    total = round(float(subtotal) + shipping + tax - discount, 2)
-
     if request.method == 'POST':
-        name = request.POST.get('full_name', '')
-        address = request.POST.get('address', '')
-        city = request.POST.get('city', '')
-        pincode = request.POST.get('pincode', '')
-        payment = request.POST.get('payment_method', 'card')
-
-        order_id = generate_order_id()
-        while Order.objects.filter(order_id=order_id).exists():
-            order_id = generate_order_id()
-
         user_id = request.session.get('user_id')
         user = None
         if user_id:
@@ -299,34 +307,23 @@ def checkout_view(request):
             except User.DoesNotExist:
                 pass
 
-        order = Order.objects.create(
-            order_id=order_id,
-            user=user,
-            customer_name=name,
-            customer_email=user.email if user else '',
-            shipping_address=address,
-            city=city,
-            pincode=pincode,
-            payment_method=payment,
-            subtotal=subtotal,
-            shipping_cost=shipping,
-            tax=tax,
-            discount=discount,
-            total=total,
-            promo_code=promo,
-            status='pending'
-        )
-        for item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                product_name=item.product.name,
-                size=item.size,
-                color=item.color,
-                quantity=item.quantity,
-                price=item.product.price,
-            )
-        cart_items.delete()
+        details = {
+            'customer_name': request.POST.get('full_name', ''),
+            'shipping_address': request.POST.get('address', ''),
+            'city': request.POST.get('city', ''),
+            'pincode': request.POST.get('pincode', ''),
+            'payment_method': request.POST.get('payment_method', 'card'),
+        }
+        try:
+            place_order(cart_key, user, details, generate_order_id(), request.session.get('promo_code', ''))
+        except EmptyCart:
+            return redirect('cart')
+        except OutOfStock as e:
+            messages.error(request, f"Sorry, not enough stock left for: {', '.join(e.product_names)}.")
+            return redirect('cart')
+
+        set_cart_count(request, 0)
+        cart_changed(request)
         if 'promo_code' in request.session:
             del request.session['promo_code']
 
@@ -334,14 +331,11 @@ def checkout_view(request):
 
     return render(request, 'store/checkout.html', {
         'cart_items': cart_items,
-        'subtotal': subtotal,
-        'shipping': shipping,
-        'tax': tax,
-        'total': total,
-        'discount': discount,
+        **get_quote(request, cart_key, cart_items).context(),
     })
 
 
+@query_budget(4)
 @login_required_customer
 def order_confirm(request):
     user_id = request.session.get('user_id')
@@ -355,6 +349,7 @@ def order_confirm(request):
     return render(request, 'store/order_confirm.html', {'order': last_order})
 
 
+@query_budget(5)
 @login_required_customer
 def user_orders(request):
     user_id = request.session.get('user_id')
@@ -368,73 +363,125 @@ def user_orders(request):
     return render(request, 'store/user_orders.html', {'orders': orders})
 
 
+# ─── CATALOG API ──────────────────────────────────────────────────────────────
+# Public and read-only; see store/api.py for the fields and the ETag.
+
+def api_error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+@query_budget(5)
+@require_safe
+@cache_control(public=True, no_cache=True)  # cache, but revalidate: a 304 is cheap
+@api.conditional
+def api_products(request):
+    try:
+        fields = api.parse_fields(request.GET, api.PRODUCT_FIELDS, api.PRODUCT_LIST_FIELDS)
+        limit = api.parse_limit(request.GET)
+    except ValueError as e:
+        return api_error(str(e))
+    filters = catalog.normalize_filters(request.GET)
+    sort = request.GET.get('sort') or catalog.default_sort(filters)
+    products = Product.objects.filter(status='active')  # category goes out as an id: no join
+    if 'description' not in fields:
+        products = products.defer('description')
+    page, total_count = catalog.product_page(filters, sort, request.GET.get('cursor', ''), limit, products)
+    next_url = None
+    if page.has_next:
+        next_url = request.build_absolute_uri(f'{request.path}?{query_with(request, cursor=page.next_cursor)}')
+    return JsonResponse({
+        'count': total_count,
+        'next': next_url,
+        'results': [api.product_data(p, fields, request) for p in page],
+    })
+
+
+@query_budget(4)
+@require_safe
+@cache_control(public=True, no_cache=True)
+@api.conditional
+def api_product(request, pk):
+    try:
+        fields = api.parse_fields(request.GET, api.PRODUCT_FIELDS, api.PRODUCT_FIELDS)
+    except ValueError as e:
+        return api_error(str(e))
+    product = Product.objects.filter(pk=pk, status='active').first()
+    if product is None:
+        return api_error('No such product', status=404)
+    return JsonResponse(api.product_data(product, fields, request))
+
+
+@query_budget(4)
+@require_safe
+@cache_control(public=True, no_cache=True)
+@api.conditional
+def api_categories(request):
+    try:
+        fields = api.parse_fields(request.GET, api.CATEGORY_FIELDS, api.CATEGORY_FIELDS)
+    except ValueError as e:
+        return api_error(str(e))
+    categories = Category.objects.annotate(
+        product_count=Count('product', filter=Q(product__status='active'))
+    ).order_by('name')
+    return JsonResponse({'results': [api.category_data(c, fields, request) for c in categories]})
+
+
 # ─── ADMIN VIEWS ──────────────────────────────────────────────────────────────
 
+@query_budget(5)
 @login_required_admin
 def admin_dashboard(request):
-    total_orders = Order.objects.count()
-    total_users = User.objects.filter(role='customer').count()
-    total_products = Product.objects.count()
-    monthly_revenue = Order.objects.filter(
-        status__in=['shipped', 'delivered']
-    ).aggregate(rev=Sum('total'))['rev'] or 0
-
-    # Revenue by month for chart
-    from django.db.models.functions import TruncMonth
-    monthly_data = (
-        Order.objects.filter(status__in=['shipped', 'delivered'])
-        .annotate(month=TruncMonth('created_at'))
-        .values('month')
-        .annotate(total=Sum('total'))
-        .order_by('month')
-    )
-    chart_labels = [d['month'].strftime('%b') if d['month'] else '' for d in monthly_data]
-    chart_data = [float(d['total']) for d in monthly_data]
+    # Revenue by month for chart, from the precomputed rollups
+    months = rollups.recent_months(rollups.local_date())
+    month_keys = [f'revenue:{rollups.month_key(m)}' for m in months]
+    metrics = rollups.read(['orders', 'customers', 'products', 'revenue', *month_keys])
+    monthly_data = [(m, metrics[key]) for m, key in zip(months, month_keys) if metrics[key].count]
+    chart_labels = [m.strftime('%b') for m, _ in monthly_data]
+    chart_data = [float(metric.amount) for _, metric in monthly_data]
 
     recent_orders = Order.objects.select_related('user').prefetch_related('items').order_by('-created_at')[:10]
 
     return render(request, 'store/admin_dashboard.html', {
-        'total_orders': total_orders,
-        'total_users': total_users,
-        'total_products': total_products,
-        'monthly_revenue': monthly_revenue,
+        'total_orders': metrics['orders'].count,
+        'total_users': metrics['customers'].count,
+        'total_products': metrics['products'].count,
+        'monthly_revenue': metrics['revenue'].amount,
         'chart_labels': json.dumps(chart_labels),
         'chart_data': json.dumps(chart_data),
         'recent_orders': recent_orders,
     })
 
 
+@login_required_admin
+def admin_db_pool(request):
+    # per process: each gunicorn worker reports its own pool
+    return JsonResponse({'pid': os.getpid(), 'pools': db_pool.stats()})
+
+
+@query_budget(5)
 @login_required_admin
 def admin_products(request):
     products = Product.objects.select_related('category').order_by('-created_at')
     categories = Category.objects.all()
-    search = request.GET.get('q', '')
-    if search:
-        products = products.filter(name__icontains=search)
+    search_q = request.GET.get('q', '')
+    if search_q:
+        products = search.search_products(products, search_q, ('name',))
 
-    total = Product.objects.count()
-    out_of_stock = Product.objects.filter(status='out_of_stock').count()
-    monthly_sales = Order.objects.filter(
-        status__in=['shipped', 'delivered']
-    ).aggregate(rev=Sum('total'))['rev'] or 0
-    avg_price = Product.objects.aggregate(avg=models_avg('price'))['avg'] or 0
+    metrics = rollups.read(['products', 'products:out_of_stock', 'revenue'])
+    import_jobs = Task.objects.filter(name='imports.products').order_by('-pk')[:5]
 
     return render(request, 'store/admin_products.html', {
+        'import_jobs': import_jobs,
         'products': products,
         'categories': categories,
-        'total': total,
-        'out_of_stock': out_of_stock,
-        'monthly_sales': monthly_sales,
-        'avg_price': round(float(avg_price), 2),
-        'search': search,
+        'total': metrics['products'].count,
+        'out_of_stock': metrics['products:out_of_stock'].count,
+        'monthly_sales': metrics['revenue'].amount,
+        'avg_price': round(float(metrics['products'].average), 2),
+        'search': search_q,
     })
 
 
-def models_avg(field):
-    from django.db.models import Avg
-    return Avg(field)
-
-
 @login_required_admin
 def admin_product_add(request):
     if request.method == 'POST':
@@ -457,12 +504,15 @@ def admin_product_add(request):
         if request.FILES.get('image'):
             product.image = request.FILES['image']
         product.save()
+        if request.FILES.get('image'):
+            tasks.enqueue('thumbnails.build', model='product', pk=product.pk, fields=['image'])
         messages.success(request, 'Product added successfully!')
         return redirect('admin_products')
     categories = Category.objects.all()
     return render(request, 'store/admin_products.html', {'categories': categories, 'form_mode': 'add'})
 
 
+@query_budget(4)
 @login_required_admin
 def admin_product_edit(request, pk):
     product = get_object_or_404(Product, pk=pk)
@@ -482,6 +532,8 @@ def admin_product_edit(request, pk):
         if request.FILES.get('image'):
             product.image = request.FILES['image']
         product.save()
+        if request.FILES.get('image'):
+            tasks.enqueue('thumbnails.build', model='product', pk=product.pk, fields=['image'])
         messages.success(request, 'Product updated!')
         return redirect('admin_products')
     categories = Category.objects.all()
@@ -490,6 +542,17 @@ def admin_product_edit(request, pk):
     })
 
 
+@login_required_admin
+def admin_product_import(request):
+    # the worker runs the import; the result is listed under Imports
+    upload = request.FILES.get('file')
+    if request.method == 'POST' and upload:
+        name = tasks.export_storage().save(f'imports/{timezone.now():%Y%m%d-%H%M%S}-{upload.name}', upload)
+        tasks.enqueue('imports.products', file=name, fmt=importers.detect_format(upload.name))
+        messages.success(request, 'Import queued; its result will be listed under Imports.')
+    return redirect('admin_products')
+
+
 @login_required_admin
 def admin_product_delete(request, pk):
     product = get_object_or_404(Product, pk=pk)
@@ -498,30 +561,78 @@ def admin_product_delete(request, pk):
     return redirect('admin_products')
 
 
+@query_budget(6)
 @login_required_admin
 def admin_orders(request):
-    orders = Order.objects.prefetch_related('items').order_by('-created_at')
+    orders = Order.objects.prefetch_related('items')
     status_filter = request.GET.get('status', '')
     if status_filter:
         orders = orders.filter(status=status_filter)
+    cursor = request.GET.get('cursor', '')
+    page = keyset_page(orders, '-created_at', cursor, ADMIN_PAGE_SIZE)
 
-    pending = Order.objects.filter(status='pending').count()
-    shipped = Order.objects.filter(status='shipped').count()
-    delivered = Order.objects.filter(status='delivered').count()
-    revenue_today = Order.objects.filter(
-        created_at__date=timezone.now().date()
-    ).aggregate(rev=Sum('total'))['rev'] or 0
+    # every stat card in one keyed lookup on the rollups
+    today_key = f'orders:{rollups.day_key(rollups.local_date())}'
+    metrics = rollups.read(['orders:pending', 'orders:shipped', 'orders:delivered', today_key])
+    export_jobs = Task.objects.filter(name='exports.orders').order_by('-pk')[:5]
 
     return render(request, 'store/admin_orders.html', {
-        'orders': orders,
-        'pending': pending,
-        'shipped': shipped,
-        'delivered': delivered,
-        'revenue_today': revenue_today,
+        'orders': page,
+        'next_query': query_with(request, cursor=page.next_cursor) if page.has_next else '',
+        'first_query': query_with(request, cursor=None) if cursor else '',
+        'pending': metrics['orders:pending'].count,
+        'shipped': metrics['orders:shipped'].count,
+        'delivered': metrics['orders:delivered'].count,
+        'revenue_today': metrics[today_key].amount,
         'status_filter': status_filter,
+        'export_jobs': export_jobs,
     })
 
 
+@query_budget(1, count_stream=False)  # the session; the body adds 2 queries per 2000 orders, plus 1
+@login_required_admin
+def admin_orders_export(request):
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in exports.FORMATS:
+        return HttpResponseBadRequest(f'Unknown export format: {fmt}', content_type='text/plain')
+    try:
+        orders = exports.filter_orders(
+            request.GET.get('status', ''), request.GET.get('from', ''), request.GET.get('to', '')
+        )
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e), content_type='text/plain')  # echoes the query: never as HTML
+
+    response = StreamingHttpResponse(exports.export_lines(orders, fmt), content_type=exports.FORMATS[fmt])
+    filename = f'orders-{timezone.now():%Y%m%d-%H%M}.{fmt}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required_admin
+def admin_orders_export_job(request):
+    # large exports: written to a file by the worker, downloaded when ready
+    if request.method == 'POST':
+        fmt = request.POST.get('format', 'csv')
+        filters = {k: request.POST.get(k, '') for k in ('status', 'date_from', 'date_to')}
+        try:
+            if fmt not in exports.FORMATS:
+                raise ValueError(f'Unknown export format: {fmt}')
+            exports.filter_orders(**filters)
+        except ValueError as e:
+            messages.error(request, str(e))
+        else:
+            tasks.enqueue('exports.orders', fmt=fmt, **filters)
+            messages.success(request, 'Export queued; it will be listed under Exports when ready.')
+    return redirect('admin_orders')
+
+
+@login_required_admin
+def admin_export_download(request, pk):
+    job = get_object_or_404(Task, pk=pk, name='exports.orders', status=Task.DONE)
+    name = job.result['file']
+    return FileResponse(tasks.export_storage().open(name), as_attachment=True, filename=name)
+
+
 @login_required_admin
 def admin_order_update(request, pk):
     order = get_object_or_404(Order, pk=pk)
@@ -532,22 +643,25 @@ def admin_order_update(request, pk):
     return redirect('admin_orders')
 
 
+@query_budget(4)
 @login_required_admin
 def admin_users(request):
-    users = User.objects.filter(role='customer').order_by('-created_at')
+    users = User.objects.filter(role='customer')
     search = request.GET.get('q', '')
     if search:
         users = users.filter(Q(name__icontains=search) | Q(email__icontains=search))
+    cursor = request.GET.get('cursor', '')
+    page = keyset_page(users, '-created_at', cursor, ADMIN_PAGE_SIZE)
 
-    total_users = users.count()
-    active_users = users.filter(status='active').count()
-    blocked_users = users.filter(status='blocked').count()
+    by_status = dict(users.order_by().values_list('status').annotate(n=Count('pk')))
 
     return render(request, 'store/admin_users.html', {
-        'users': users,
-        'total_users': total_users,
-        'active_users': active_users,
-        'blocked_users': blocked_users,
+        'users': page,
+        'next_query': query_with(request, cursor=page.next_cursor) if page.has_next else '',
+        'first_query': query_with(request, cursor=None) if cursor else '',
+        'total_users': sum(by_status.values()),
+        'active_users': by_status.get('active', 0),
+        'blocked_users': by_status.get('blocked', 0),
         'search': search,
     })
 
@@ -567,3 +681,12 @@ def admin_user_delete(request, pk):
     user.delete()
     messages.success(request, 'User deleted.')
     return redirect('admin_users')
+
+
+# ─── MEDIA ────────────────────────────────────────────────────────────────────
+
+def media_thumbnail(request, path):
+    # derivative names are content hashes, so browsers and CDNs may keep them forever
+    response = serve(request, path, document_root=settings.MEDIA_ROOT / thumbnails.THUMB_DIR)
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response